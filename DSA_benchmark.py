@@ -0,0 +1,206 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from DSA_python_V2 import BST, AVLTree, BTree, CompactBST, Stack, Queue, Instrumentation
+
+# --- Recording Canvas ---
+class RecordingCanvas:
+    """Stand-in for tk.Canvas that only counts the calls made to it."""
+    def __init__(self):
+        self.counts = {}
+
+    def _record(self, name):
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def items_created(self):
+        """Return how many items were created through create_* calls."""
+        return sum(count for name, count in self.counts.items() if name.startswith("create_"))
+
+    def create_oval(self, *args, **options):
+        self._record("create_oval")
+
+    def create_text(self, *args, **options):
+        self._record("create_text")
+
+    def create_line(self, *args, **options):
+        self._record("create_line")
+
+    def create_polygon(self, *args, **options):
+        self._record("create_polygon")
+
+    def create_rectangle(self, *args, **options):
+        self._record("create_rectangle")
+
+    def delete(self, *args):
+        self._record("delete")
+
+    def coords(self, *args):
+        self._record("coords")
+
+    def itemconfig(self, *args, **options):
+        self._record("itemconfig")
+
+# --- Workloads ---
+WORKLOADS = ["random", "sorted", "reverse", "duplicates"]
+
+def make_workload(kind, size, seed):
+    """Return a reproducible list of integer keys for the given workload."""
+    rng = random.Random(f"{seed}-{kind}-{size}")
+    if kind == "random":
+        return [rng.randrange(size * 10) for _ in range(size)]
+    if kind == "sorted":
+        return list(range(size))
+    if kind == "reverse":
+        return list(range(size, 0, -1))
+    if kind == "duplicates":
+        return [rng.randrange(max(1, size // 100)) for _ in range(size)]
+    raise ValueError(f"Unknown workload: {kind}")
+
+def timed(function, *args):
+    """Run function once and return (seconds, result)."""
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def draw_stats(structure):
+    """Draw a structure on a recording canvas and return its frame statistics."""
+    canvas = RecordingCanvas()
+    seconds, _ = timed(structure.draw, canvas)
+    return {"seconds": seconds, "canvas_items": canvas.items_created()}
+
+# --- Benchmarks ---
+def instrument(structure, enabled):
+    """Attach a fresh Instrumentation to structure if enabled and return it."""
+    if enabled:
+        structure.stats = Instrumentation()
+    return structure.stats
+
+def bench_tree(cls, keys, seed, draw, counters=False):
+    """Time insert, inorder, delete and optionally draw for a tree class."""
+    tree = cls()
+    stats = instrument(tree, counters)
+    insert = tree.insert
+    result = {}
+
+    seconds, _ = timed(lambda: [insert(key) for key in keys])
+    result["insert"] = seconds
+    result["height"] = tree.height()
+    if isinstance(tree, BST):
+        result["bytes_per_element"] = tree.bytes_per_element()
+    result["inorder"], _ = timed(tree.inorder_list)
+    if draw:
+        result["draw"] = draw_stats(tree)
+
+    victims = list(keys)
+    random.Random(seed).shuffle(victims)
+    delete = tree.delete
+    result["delete"], _ = timed(lambda: [delete(key) for key in victims])
+    if stats is not None:
+        result["counters"] = stats.totals
+    return result
+
+def bench_compact(keys, seed):
+    """Time insert, inorder and delete for CompactBST and report its memory per key."""
+    tree = CompactBST()
+    insert = tree.insert
+    result = {}
+    result["insert"], _ = timed(lambda: [insert(key) for key in keys])
+    result["bytes_per_element"] = tree.bytes_per_element()
+    result["inorder"], _ = timed(tree.inorder_list)
+
+    victims = list(keys)
+    random.Random(seed).shuffle(victims)
+    delete = tree.delete
+    result["delete"], _ = timed(lambda: [delete(key) for key in victims])
+    return result
+
+def bench_stack(keys, draw, counters=False):
+    """Time push, optional draw and pop for Stack."""
+    stack = Stack()
+    stats = instrument(stack, counters)
+    result = {}
+    push = stack.push
+    result["push"], _ = timed(lambda: [push(key) for key in keys])
+    if draw:
+        result["draw"] = draw_stats(stack)
+    pop = stack.pop
+    result["pop"], _ = timed(lambda: [pop() for _ in keys])
+    if stats is not None:
+        result["counters"] = stats.totals
+    return result
+
+def bench_queue(keys, draw, counters=False):
+    """Time enqueue, optional draw and dequeue for Queue."""
+    queue = Queue()
+    stats = instrument(queue, counters)
+    result = {}
+    enqueue = queue.enqueue
+    result["enqueue"], _ = timed(lambda: [enqueue(key) for key in keys])
+    if draw:
+        result["draw"] = draw_stats(queue)
+    dequeue = queue.dequeue
+    result["dequeue"], _ = timed(lambda: [dequeue() for _ in keys])
+    if stats is not None:
+        result["counters"] = stats.totals
+    return result
+
+def run(sizes, workloads, seed, draw_max, degenerate_max, counters=False, min_degrees=(2, 16)):
+    """Run every benchmark and return the results as a JSON-ready dict."""
+    results = []
+    for size in sizes:
+        for kind in workloads:
+            keys = make_workload(kind, size, seed)
+            draw = size <= draw_max
+            entry = {"size": size, "workload": kind}
+            # An unbalanced BST on ordered input is quadratic; skip the huge cases
+            if kind in ("sorted", "reverse") and size > degenerate_max:
+                entry["BST"] = {"skipped": f"degenerate input above {degenerate_max} keys"}
+                entry["CompactBST"] = entry["BST"]
+            else:
+                entry["BST"] = bench_tree(BST, keys, seed, draw, counters)
+                entry["BST(multiset)"] = bench_tree(lambda: BST(multiset=True), keys, seed, draw, counters)
+                entry["CompactBST"] = bench_compact(keys, seed)
+            entry["AVLTree"] = bench_tree(AVLTree, keys, seed, draw, counters)
+            entry["AVLTree(multiset)"] = bench_tree(lambda: AVLTree(multiset=True), keys, seed, draw, counters)
+            for t in min_degrees:
+                entry[f"BTree(t={t})"] = bench_tree(lambda: BTree(t), keys, seed, draw, counters)
+            entry["Stack"] = bench_stack(keys, draw, counters)
+            entry["Queue"] = bench_queue(keys, draw, counters)
+            results.append(entry)
+            print(f"finished {kind} x {size}", file=sys.stderr)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": seed,
+        "results": results,
+    }
+
+# --- Main ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless benchmarks for BST, AVLTree, BTree, CompactBST, Stack and Queue.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10 ** k for k in range(2, 7)])
+    parser.add_argument("--workloads", nargs="+", choices=WORKLOADS, default=WORKLOADS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--draw-max", type=int, default=10 ** 5,
+                        help="largest size for which draw() is benchmarked")
+    parser.add_argument("--degenerate-max", type=int, default=10 ** 4,
+                        help="largest sorted/reverse input fed to the unbalanced BST")
+    parser.add_argument("--counters", action="store_true",
+                        help="attach Instrumentation and report operation counters (adds overhead)")
+    parser.add_argument("--min-degrees", type=int, nargs="+", default=[2, 16],
+                        help="B-tree minimum degrees to compare against the binary trees")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.workloads, args.seed, args.draw_max, args.degenerate_max, args.counters,
+                 args.min_degrees)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
@@ -1,64 +1,576 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, filedialog
 import random
 import math
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+from array import array
+import heapq
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, chain, groupby, islice, repeat
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from xml.sax.saxutils import escape as xml_escape
+
+# --- Instrumentation ---
+class Instrumentation:
+    """Opt-in operation counters and phase timings.
+
+    Assign an instance to the stats attribute of a BST, Stack, Queue,
+    RetainedCanvas or RenderScheduler to start counting. totals accumulate for the lifetime of
+    the instance while last holds the numbers since the last reset_last().
+    """
+    COUNTERS = ("comparisons", "visits", "structural", "rotations", "layout_nodes",
+                "canvas_created", "canvas_updated", "canvas_deleted", "frames_skipped")
+    PHASES = ("mutation", "layout", "draw")
+
+    def __init__(self):
+        self.totals = self._empty()
+        self.last = self._empty()
+
+    def _empty(self):
+        counters = dict.fromkeys(self.COUNTERS, 0)
+        counters.update(dict.fromkeys((f"{phase}_time" for phase in self.PHASES), 0.0))
+        return counters
+
+    def count(self, **deltas):
+        """Add to one or more counters."""
+        for name, delta in deltas.items():
+            self.totals[name] += delta
+            self.last[name] += delta
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as the given phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.count(**{f"{name}_time": time.perf_counter() - start})
+
+    def reset_last(self):
+        """Start a fresh set of per-operation numbers."""
+        self.last = self._empty()
+
+    def summary(self):
+        """Format the per-operation numbers for display."""
+        last = self.last
+        return (
+            f"cmp {last['comparisons']}  visits {last['visits']}  "
+            f"changes {last['structural']} (rot {last['rotations']})\n"
+            f"canvas +{last['canvas_created']} ~{last['canvas_updated']} -{last['canvas_deleted']}  "
+            f"layout {last['layout_nodes']} nodes  frames skipped {last['frames_skipped']}\n"
+            f"mutation {last['mutation_time'] * 1000:.2f} ms  "
+            f"layout {last['layout_time'] * 1000:.2f} ms  "
+            f"draw {last['draw_time'] * 1000:.2f} ms"
+        )
 
 # --- Node and BST Implementation ---
 class Node:
     """Represents a node in the Binary Search Tree (BST)."""
+    __slots__ = ("value", "left", "right", "height", "size", "count", "layout")
+
     def __init__(self, value):
         self.value = value
         self.left = None
         self.right = None
+        self.height = 1
+        self.size = 1  # Values stored in the subtree, counting repeats
+        self.count = 1  # Copies of value held by this node (above 1 only in multiset mode)
+        self.layout = None  # Cached tidy-layout data, see BST.layout()
 
 class BST:
-    """Binary Search Tree (BST) class."""
-    def __init__(self):
+    """Binary Search Tree (BST) class.
+
+    By default equal values are stored as separate nodes in the right
+    subtree. In multiset mode each node keeps a count instead, so repeats
+    cost nothing in height or node count.
+    """
+    stats = None  # Optional Instrumentation
+
+    def __init__(self, multiset=False):
         self.root = None
+        self.multiset = multiset
+
+    @classmethod
+    def from_sorted(cls, values, presorted=False, multiset=False):
+        """Build a perfectly balanced tree from values in O(n).
+
+        Unless presorted is True the values are sorted first (O(n log n)).
+        """
+        tree = cls(multiset=multiset)
+        tree.root = tree._build_sorted(values if presorted else sorted(values))
+        return tree
+
+    def _build_sorted(self, values):
+        """Build a balanced subtree from sorted values, folding repeats into counts in multiset mode."""
+        if not self.multiset:
+            return self._build_balanced(values)
+        keys, counts = [], []
+        for value, group in groupby(values):
+            keys.append(value)
+            counts.append(sum(1 for _ in group))
+        return self._build_balanced(keys, counts)
+
+    def _build_balanced(self, values, counts=None):
+        """Build a balanced subtree from a sorted sequence and return its root.
+
+        counts, if given, holds the count of each value.
+        """
+        values = values if isinstance(values, list) else list(values)
+        if not values:
+            return None
+        totals = list(accumulate(counts, initial=0)) if counts is not None else None
+        root = None
+        # Each entry is a half-open slice of values and the link to attach it to
+        stack = [(0, len(values), None, False)]
+        while stack:
+            lo, hi, parent, is_left = stack.pop()
+            mid = (lo + hi) // 2
+            node = Node(values[mid])
+            if totals is not None:
+                node.count = counts[mid]
+                node.size = totals[hi] - totals[lo]
+            else:
+                node.size = hi - lo
+            node.height = (hi - lo).bit_length()
+            if parent is None:
+                root = node
+            elif is_left:
+                parent.left = node
+            else:
+                parent.right = node
+            if lo < mid:
+                stack.append((lo, mid, node, True))
+            if mid + 1 < hi:
+                stack.append((mid + 1, hi, node, False))
+        return root
+
+    def copy(self):
+        """Return a structural copy of the tree in O(n)."""
+        tree = type(self)(multiset=self.multiset)
+        if self.root is None:
+            return tree
+
+        def clone(node):
+            twin = Node(node.value)
+            twin.height = node.height
+            twin.size = node.size
+            twin.count = node.count
+            return twin
+
+        tree.root = clone(self.root)
+        stack = [(self.root, tree.root)]
+        while stack:
+            node, twin = stack.pop()
+            if node.left:
+                twin.left = clone(node.left)
+                stack.append((node.left, twin.left))
+            if node.right:
+                twin.right = clone(node.right)
+                stack.append((node.right, twin.right))
+        return tree
 
     def insert(self, value):
         """Insert a value into the BST."""
-        if self.root is None:
-            self.root = Node(value)
+        self._insert_path(value)
+
+    def insert_many(self, values):
+        """Insert a batch of values.
+
+        Large batches are merged with the existing keys and the tree is rebuilt
+        balanced in O(n + k log k); small batches fall back to single inserts.
+        """
+        values = sorted(values)
+        if len(values) < len(self):
+            for value in values:
+                self.insert(value)
         else:
-            self._insert(self.root, value)
+            self.root = self._build_sorted(list(heapq.merge(self.inorder(), values)))
 
-    def _insert(self, node, value):
-        """Helper function to insert a value recursively."""
-        if value < node.value:
-            if node.left is None:
-                node.left = Node(value)
-            else:
-                self._insert(node.left, value)
+    def _insert_path(self, value):
+        """Insert a value iteratively and return the list of its ancestors.
+
+        In multiset mode a repeated value only bumps its node's count, and
+        that node ends the returned path.
+        """
+        path = []
+        node = self.root
+        while node is not None:
+            node.size += 1
+            node.layout = None
+            path.append(node)
+            if self.multiset and value == node.value:
+                node.count += 1
+                if self.stats is not None:
+                    self.stats.count(comparisons=len(path), visits=len(path))
+                return path
+            node = node.left if value < node.value else node.right
+
+        new_node = Node(value)
+        if not path:
+            self.root = new_node
+        elif value < path[-1].value:
+            path[-1].left = new_node
         else:
-            if node.right is None:
-                node.right = Node(value)
-            else:
-                self._insert(node.right, value)
+            path[-1].right = new_node
+        if self.stats is not None:
+            self.stats.count(comparisons=len(path), visits=len(path), structural=1)
+        return path
 
     def delete(self, value):
-        """Delete a value from the BST."""
-        self.root = self._delete(self.root, value)
+        """Delete a value from the BST.
 
-    def _delete(self, node, value):
-        """Helper function to delete a value from the BST."""
+        Tracks only the parent instead of building the ancestor path that
+        _delete_path returns for the balancing subclasses.
+        """
+        parent = None
+        node = self.root
+        while node is not None:
+            node_value = node.value
+            if node_value == value:
+                break
+            node.size -= 1
+            node.layout = None
+            parent = node
+            node = node.left if value < node_value else node.right
+        # The depth is only needed for the counters, so it is measured apart
+        # from the descent by walking the same route again
+        depth = 0
+        if node is None or self.stats is not None:
+            walk = self.root
+            while walk is not node:
+                if node is None:
+                    walk.size += 1  # a miss gives the sizes back
+                depth += 1
+                walk = walk.left if value < walk.value else walk.right
         if node is None:
-            return node
+            if self.stats is not None:
+                self.stats.count(comparisons=depth, visits=depth)
+            return
+        comparisons = depth + 1
+
+        if node.count > 1:
+            node.count -= 1
+            node.size -= 1
+            node.layout = None
+            if self.stats is not None:
+                self.stats.count(comparisons=comparisons, visits=depth + 1)
+            return
 
-        if value < node.value:
-            node.left = self._delete(node.left, value)
-        elif value > node.value:
-            node.right = self._delete(node.right, value)
+        left, right = node.left, node.right
+        if left is not None and right is not None:
+            node.size -= 1
+            node.layout = None
+            parent = node
+            depth += 1
+            successor = right
+            while successor.left is not None:
+                successor.size -= 1
+                successor.layout = None
+                parent = successor
+                depth += 1
+                successor = successor.left
+            if successor.count > 1:
+                extra = successor.count - 1
+                walk = right
+                while walk is not successor:
+                    walk.size -= extra
+                    walk = walk.left
+            node.value = successor.value
+            node.count = successor.count
+            node = successor
+            left, right = None, node.right
+
+        child = left if left is not None else right
+        if parent is None:
+            self.root = child
+        elif parent.left is node:
+            parent.left = child
         else:
-            if node.left is None:
-                return node.right
-            elif node.right is None:
-                return node.left
-            temp = self._min_value_node(node.right)
-            node.value = temp.value
-            node.right = self._delete(node.right, temp.value)
+            parent.right = child
+        if self.stats is not None:
+            self.stats.count(comparisons=comparisons, visits=depth + 1, structural=1)
 
-        return node
+    def _delete_path(self, value):
+        """Delete a value iteratively.
+
+        Returns the ancestors of the node that was physically unlinked, or
+        None if the value is not in the tree.
+        """
+        # Sizes drop by one on the way down, so the path is walked only once;
+        # a miss gives them back (its path keeps an invalidated layout)
+        path = []
+        append = path.append
+        node = self.root
+        while node is not None:
+            node_value = node.value
+            if node_value == value:
+                break
+            node.size -= 1
+            node.layout = None
+            append(node)
+            node = node.left if value < node_value else node.right
+        if node is None:
+            for ancestor in path:
+                ancestor.size += 1
+            if self.stats is not None:
+                self.stats.count(comparisons=len(path), visits=len(path))
+            return None
+        comparisons = len(path) + 1
+
+        if node.count > 1:
+            node.count -= 1
+            node.size -= 1
+            node.layout = None
+            append(node)
+            if self.stats is not None:
+                self.stats.count(comparisons=comparisons, visits=len(path))
+            return path
+
+        # Two children: copy the in-order successor up and unlink it instead
+        left, right = node.left, node.right
+        if left is not None and right is not None:
+            node.size -= 1
+            node.layout = None
+            append(node)
+            spine = len(path)  # path[spine:] lie between node and the successor
+            successor = right
+            while successor.left is not None:
+                successor.size -= 1
+                successor.layout = None
+                append(successor)
+                successor = successor.left
+            if successor.count > 1:
+                # The successor takes all its repeats up past its own spine
+                for ancestor in path[spine:]:
+                    ancestor.size -= successor.count - 1
+            node.value = successor.value
+            node.count = successor.count
+            node = successor
+            left, right = None, node.right
+
+        child = left if left is not None else right
+        if path:
+            parent = path[-1]
+            if parent.left is node:
+                parent.left = child
+            else:
+                parent.right = child
+        else:
+            self.root = child
+        if self.stats is not None:
+            self.stats.count(comparisons=comparisons, visits=len(path) + 1, structural=1)
+        return path
+
+    def _search_steps(self, value):
+        """Yield ("compare", node) for each node on the search path for value.
+
+        Returns the node holding value, or None.
+        """
+        node = self.root
+        while node is not None:
+            yield ("compare", node)
+            if value == node.value:
+                return node
+            node = node.left if value < node.value else node.right
+        return None
+
+    def insert_steps(self, value):
+        """Insert a value step by step, yielding the comparison path first."""
+        node = self.root
+        while node is not None:
+            yield ("compare", node)
+            if self.multiset and value == node.value:
+                break
+            node = node.left if value < node.value else node.right
+        self.insert(value)
+        yield ("done", None)
+
+    def delete_steps(self, value):
+        """Delete a value step by step, yielding the search path and the match."""
+        node = yield from self._search_steps(value)
+        if node is not None:
+            yield ("found", node)
+            self.delete(value)
+            yield ("done", None)
+
+    def _replace_child(self, parent, old, new):
+        """Point parent's link to old at new (or the root if parent is None)."""
+        if parent is None:
+            self.root = new
+        elif parent.left is old:
+            parent.left = new
+        else:
+            parent.right = new
+
+    def __len__(self):
+        return self.root.size if self.root else 0
+
+    def _size(self, node):
+        """Get the subtree size of a node (0 for an empty subtree)."""
+        return node.size if node else 0
+
+    def select(self, k):
+        """Return the k-th smallest value (0-based) in O(height)."""
+        if not 0 <= k < len(self):
+            raise IndexError("BST index out of range")
+        node = self.root
+        while True:
+            left_size = self._size(node.left)
+            if k < left_size:
+                node = node.left
+            elif k < left_size + node.count:
+                return node.value
+            else:
+                k -= left_size + node.count
+                node = node.right
+
+    def rank(self, value):
+        """Return the number of values strictly less than value in O(height)."""
+        rank = 0
+        node = self.root
+        while node is not None:
+            if value <= node.value:
+                node = node.left
+            else:
+                rank += self._size(node.left) + node.count
+                node = node.right
+        return rank
+
+    def random_value(self, rng=random):
+        """Return a uniformly random value from the tree in O(height)."""
+        if self.root is None:
+            raise IndexError("Cannot choose from an empty BST")
+        return self.select(rng.randrange(len(self)))
+
+    def __contains__(self, value):
+        """Check whether value is in the tree in O(height)."""
+        node = self.root
+        visits = 0
+        while node is not None:
+            visits += 1
+            if value == node.value:
+                break
+            node = node.left if value < node.value else node.right
+        if self.stats is not None:
+            self.stats.count(comparisons=visits, visits=visits)
+        return node is not None
+
+    def min(self):
+        """Return the smallest value, or None if the tree is empty."""
+        if self.root is None:
+            return None
+        return self._min_value_node(self.root).value
+
+    def max(self):
+        """Return the largest value, or None if the tree is empty."""
+        node = self.root
+        if node is None:
+            return None
+        while node.right is not None:
+            node = node.right
+        return node.value
+
+    def _below(self, value, inclusive):
+        """Return the node with the largest value below (or equal to) value, or None."""
+        best = None
+        node = self.root
+        visits = 0
+        while node is not None:
+            visits += 1
+            if node.value < value or (inclusive and node.value == value):
+                best = node
+                node = node.right
+            else:
+                node = node.left
+        if self.stats is not None:
+            self.stats.count(comparisons=visits, visits=visits)
+        return best
+
+    def _above(self, value, inclusive):
+        """Return the node with the smallest value above (or equal to) value, or None."""
+        best = None
+        node = self.root
+        visits = 0
+        while node is not None:
+            visits += 1
+            if node.value > value or (inclusive and node.value == value):
+                best = node
+                node = node.left
+            else:
+                node = node.right
+        if self.stats is not None:
+            self.stats.count(comparisons=visits, visits=visits)
+        return best
+
+    def floor(self, value):
+        """Return the largest value <= value in O(height), or None."""
+        node = self._below(value, True)
+        return node.value if node is not None else None
+
+    def ceiling(self, value):
+        """Return the smallest value >= value in O(height), or None."""
+        node = self._above(value, True)
+        return node.value if node is not None else None
+
+    def predecessor(self, value):
+        """Return the largest value < value in O(height), or None."""
+        node = self._below(value, False)
+        return node.value if node is not None else None
+
+    def successor(self, value):
+        """Return the smallest value > value in O(height), or None."""
+        node = self._above(value, False)
+        return node.value if node is not None else None
+
+    def range(self, lo, hi):
+        """Lazily yield the values v with lo <= v <= hi in sorted order, in O(height + k)."""
+        for node in self.range_nodes(lo, hi):
+            for _ in range(node.count):
+                yield node.value
+
+    def range_nodes(self, lo, hi):
+        """Lazily yield the nodes whose values lie in [lo, hi] in sorted order."""
+        stack = []
+        node = self.root
+        while True:
+            # Walk down towards lo, skipping every left subtree that lies below it
+            while node is not None:
+                if node.value < lo:
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            if node.value > hi:
+                return
+            if self.stats is not None:
+                self.stats.count(visits=1)
+            yield node
+            node = node.right
+
+    def bytes_per_element(self):
+        """Return the node storage bytes used per stored key (excluding the keys)."""
+        if self.root is None:
+            return 0.0
+        total = 0
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            total += sys.getsizeof(node)
+            if node.left:
+                stack.append(node.left)
+            if node.right:
+                stack.append(node.right)
+        return total / len(self)
 
     def _min_value_node(self, node):
         """Get the node with the minimum value."""
@@ -68,60 +580,295 @@ class BST:
         return current
 
     def inorder(self):
-        """Return the inorder traversal of the tree."""
-        return self._inorder(self.root)
-
-    def _inorder(self, node):
-        """Helper function for inorder traversal."""
-        return self._inorder(node.left) + [node.value] + self._inorder(node.right) if node else []
+        """Yield the values of the tree in sorted (left, node, right) order, repeating counted values."""
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            if node.count == 1:
+                yield node.value
+            else:
+                yield from repeat(node.value, node.count)
+            node = node.right
 
-    def draw(self, canvas, node=None, x=400, y=100, level=0, colors=None):
-        """Draw the BST on the canvas with arrows."""
-        if node is None:
-            node = self.root
-            # Draw BST title
-            canvas.create_text(
-                400, 50,
-                text="Binary Search Tree Visualization",
-                fill=colors['primary'] if colors else "#6c5ce7",
-                font=("Segoe UI", 24, "bold")
-            )
+    def preorder(self):
+        """Yield the values of the tree in (node, left, right) order, repeating counted values."""
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            if node.count == 1:
+                yield node.value
+            else:
+                yield from repeat(node.value, node.count)
+            if node.right:
+                stack.append(node.right)
+            if node.left:
+                stack.append(node.left)
 
-        if node is not None:
-            # Node shadow effect
-            canvas.create_oval(
-                x - 23, y - 23, x + 27, y + 27,
-                fill="#dfe6e9",
-                outline=""
-            )
-            
-            # Node circle with gradient effect
-            canvas.create_oval(
-                x - 25, y - 25, x + 25, y + 25,
-                fill=colors['primary'] if colors else "#6c5ce7",
-                outline=colors['secondary'] if colors else "#a8a5e6",
-                width=2
-            )
-            
-            # Node value
-            canvas.create_text(
-                x, y,
-                text=str(node.value),
-                fill="white",
-                font=("Segoe UI", 12, "bold")
-            )
+    def postorder(self):
+        """Yield the values of the tree in (left, right, node) order, repeating counted values."""
+        stack = []
+        last = None
+        node = self.root
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node.left
+                continue
+            peek = stack[-1]
+            if peek.right is not None and last is not peek.right:
+                node = peek.right
+            else:
+                if peek.count == 1:
+                    yield peek.value
+                else:
+                    yield from repeat(peek.value, peek.count)
+                last = stack.pop()
 
-            # Draw arrows instead of lines
+    def level_order(self):
+        """Yield the values of the tree level by level (breadth-first), repeating counted values."""
+        queue = deque([self.root] if self.root else [])
+        while queue:
+            node = queue.popleft()
+            if node.count == 1:
+                yield node.value
+            else:
+                yield from repeat(node.value, node.count)
             if node.left:
-                self.draw_arrow(canvas, x, y, x - 100, y + 50, colors)
-                self.draw(canvas, node.left, x - 100, y + 50, level + 1, colors)
+                queue.append(node.left)
+            if node.right:
+                queue.append(node.right)
+
+    def inorder_list(self):
+        """Return the inorder traversal of the tree as a list."""
+        return list(self.inorder())
+
+    def height(self):
+        """Return the height of the tree (number of levels)."""
+        height = 0
+        level = [self.root] if self.root else []
+        while level:
+            height += 1
+            level = [child for node in level for child in (node.left, node.right) if child]
+        return height
+
+    def layout(self):
+        """Compute (or reuse) the tidy layout of the tree and return the root's.
+
+        Uses the Reingold-Tilford algorithm: each subtree is laid out once,
+        then its two children are pushed apart just far enough that no level
+        overlaps. Per node we cache a tuple of
+
+            (child offset, left contour, right contour, height, min x, max x)
+
+        in units of one node spacing, relative to the node itself. Contours
+        are immutable linked cells (dx, next) holding the x step from one
+        level to the next, so a parent shares its children's contours and
+        merging costs O(min(left height, right height)), which sums to O(n)
+        for the whole tree. Mutations clear the cache along the touched path
+        only, so after an insert or delete just that spine is recomputed.
+        """
+        if self.root is None:
+            return None
+        stack = [(self.root, False)] if self.root.layout is None else []
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                node.layout = self._layout_node(node)
+                if self.stats is not None:
+                    self.stats.count(layout_nodes=1)
+                continue
+            stack.append((node, True))
+            for child in (node.left, node.right):
+                if child is not None and child.layout is None:
+                    stack.append((child, False))
+        return self.root.layout
+
+    def _layout_node(self, node):
+        """Combine the cached layouts of node's children into node's layout."""
+        left = node.left.layout if node.left else None
+        right = node.right.layout if node.right else None
+        if left is None and right is None:
+            return (0.0, None, None, 1, 0.0, 0.0)
+        if right is None:
+            offset = 0.5
+            _, lc, rc, height, min_x, max_x = left
+            return (offset, (-offset, lc), (-offset, rc), height + 1,
+                    min(0.0, min_x - offset), max(0.0, max_x - offset))
+        if left is None:
+            offset = 0.5
+            _, lc, rc, height, min_x, max_x = right
+            return (offset, (offset, lc), (offset, rc), height + 1,
+                    min(0.0, min_x + offset), max(0.0, max_x + offset))
+
+        # Walk the facing contours level by level to find the minimum separation
+        separation = 1.0
+        left_x = right_x = 0.0
+        cell_l, cell_r = left[2], right[1]
+        while cell_l is not None and cell_r is not None:
+            left_x += cell_l[0]
+            right_x += cell_r[0]
+            separation = max(separation, left_x - right_x + 1.0)
+            cell_l, cell_r = cell_l[1], cell_r[1]
+        offset = separation / 2
+
+        left_height, right_height = left[3], right[3]
+        if left_height >= right_height:
+            left_contour = (-offset, left[1])
+        else:
+            left_contour = self._thread_contour(-offset, left[1], offset, right[1], left_height)
+        if right_height >= left_height:
+            right_contour = (offset, right[2])
+        else:
+            right_contour = self._thread_contour(offset, right[2], -offset, left[2], right_height)
+        return (offset, left_contour, right_contour, max(left_height, right_height) + 1,
+                min(left[4] - offset, right[4] + offset), max(left[5] - offset, right[5] + offset))
+
+    def _thread_contour(self, start, short, deep_start, deep, levels):
+        """Copy the contour of the shorter child and continue it into the taller one.
+
+        short and deep are contour chains below children placed at x = start
+        and x = deep_start; the shorter child spans levels levels.
+        """
+        steps = [start]
+        short_x = start
+        while short is not None:
+            steps.append(short[0])
+            short_x += short[0]
+            short = short[1]
+
+        deep_x = deep_start
+        for _ in range(levels):
+            deep_x += deep[0]
+            deep = deep[1]
+
+        chain = (deep_x - short_x, deep)
+        for step in reversed(steps):
+            chain = (step, chain)
+        return chain
+
+    def draw(self, canvas, x=400, y=100, colors=None, viewport=None, highlight=()):
+        """Draw the BST on the canvas with arrows.
+
+        With a viewport only the nodes inside its visible area get canvas
+        items, and subtrees too narrow to read at the current zoom collapse
+        into a single glyph showing their node count. Nodes in highlight are
+        filled with the accent color.
+        """
+        # Draw BST title
+        canvas.create_text(
+            400, 50,
+            text="Binary Search Tree Visualization",
+            fill=colors['primary'] if colors else "#6c5ce7",
+            font=("Segoe UI", 24, "bold"),
+            tags=("title",)
+        )
+
+        if self.root is None:
+            return
 
+        # Positions come from the cached tidy layout with the root anchored at
+        # x, so an edit only moves the subtrees whose offsets changed; framing
+        # is left to the viewport's pan
+        node_gap = 60
+        level_gap = 70
+        self.layout()
+
+        view = viewport or Viewport()
+        scale = view.scale
+        radius = 25 * scale
+        detailed = scale >= 0.5
+
+        stack = [(self.root, x, y)]
+        while stack:
+            node, x, y = stack.pop()
+            layout = node.layout
+            sx, sy = view.to_screen(x, y)
+
+            # Skip subtrees whose bounding box is entirely off-screen
+            left_x = sx + layout[4] * node_gap * scale - radius
+            right_x = sx + layout[5] * node_gap * scale + radius
+            bottom_y = sy + (layout[3] - 1) * level_gap * scale + radius
+            if not view.visible(left_x, sy - radius, right_x, bottom_y):
+                continue
+
+            # Canvas items are tagged per node so a retained renderer can reuse them
+            key = f"node{id(node)}"
+
+            # Collapse subtrees too narrow to read into a summary glyph
+            if (node.left or node.right) and right_x - left_x < view.summary_width:
+                self.draw_summary(canvas, node, sx, sy, left_x, right_x, bottom_y, colors, key)
+                continue
+
+            if view.visible(sx - radius, sy - radius, sx + radius, sy + radius):
+                # Node shadow effect
+                if detailed:
+                    canvas.create_oval(
+                        sx - radius + 2, sy - radius + 2, sx + radius + 2, sy + radius + 2,
+                        fill="#dfe6e9",
+                        outline="",
+                        tags=(key + "-shadow",)
+                    )
+                
+                # Node circle with gradient effect
+                canvas.create_oval(
+                    sx - radius, sy - radius, sx + radius, sy + radius,
+                    fill=self._node_fill(node, highlight, colors),
+                    outline=colors['secondary'] if colors else "#a8a5e6",
+                    width=2,
+                    tags=(key + "-circle",)
+                )
+                
+                # Node value
+                if detailed:
+                    canvas.create_text(
+                        sx, sy,
+                        text=str(node.value) if node.count == 1 else f"{node.value}×{node.count}",
+                        fill="white",
+                        font=("Segoe UI", max(1, round(12 * scale)), "bold"),
+                        tags=(key + "-text",)
+                    )
+
+            # Draw arrows instead of lines; the left subtree is drawn first
+            dx = layout[0] * node_gap
+            for child, child_x in ((node.left, x - dx), (node.right, x + dx)):
+                if child is None:
+                    continue
+                cx, cy = view.to_screen(child_x, y + level_gap)
+                if view.visible(min(sx, cx), sy, max(sx, cx), cy):
+                    self.draw_arrow(canvas, sx, sy, cx, cy, colors, f"edge{id(child)}", head=detailed)
             if node.right:
-                self.draw_arrow(canvas, x, y, x + 100, y + 50, colors)
-                self.draw(canvas, node.right, x + 100, y + 50, level + 1, colors)
+                stack.append((node.right, x + dx, y + level_gap))
+            if node.left:
+                stack.append((node.left, x - dx, y + level_gap))
 
-    def draw_arrow(self, canvas, x1, y1, x2, y2, colors):
-        """Draw an arrow between two points."""
+    def _node_fill(self, node, highlight, colors):
+        """Pick a node's fill color, using the accent color when highlighted."""
+        if node in highlight:
+            return colors.get('accent', "#00cec9") if colors else "#00cec9"
+        return colors['primary'] if colors else "#6c5ce7"
+
+    def draw_summary(self, canvas, node, x, y, left_x, right_x, bottom_y, colors, key):
+        """Draw a collapsed subtree as a triangle labelled with its value count."""
+        canvas.create_polygon(
+            x, y, left_x, bottom_y, right_x, bottom_y,
+            fill=colors['secondary'] if colors else "#a8a5e6",
+            outline=colors['primary'] if colors else "#6c5ce7",
+            tags=(key + "-summary",)
+        )
+        canvas.create_text(
+            x, (y + 2 * bottom_y) / 3,
+            text=str(node.size),
+            fill=colors['primary'] if colors else "#6c5ce7",
+            font=("Segoe UI", 8, "bold"),
+            tags=(key + "-count",)
+        )
+
+    def draw_arrow(self, canvas, x1, y1, x2, y2, colors, key="arrow", head=True):
+        """Draw an arrow between two points, tagging its items with key."""
         # Calculate arrow head points
         angle = math.atan2(y2 - y1, x2 - x1)
         arrow_length = 15
@@ -138,43 +885,842 @@ class BST:
             x1, y1, x2, y2,
             fill=colors['secondary'] if colors else "#a8a5e6",
             width=2,
-            smooth=True
+            smooth=True,
+            tags=(key + "-line",)
         )
         
         # Draw arrow head
-        canvas.create_polygon(
-            x2, y2, ax1, ay1, ax2, ay2,
-            fill=colors['secondary'] if colors else "#a8a5e6",
-            outline=colors['secondary'] if colors else "#a8a5e6"
+        if head:
+            canvas.create_polygon(
+                x2, y2, ax1, ay1, ax2, ay2,
+                fill=colors['secondary'] if colors else "#a8a5e6",
+                outline=colors['secondary'] if colors else "#a8a5e6",
+                tags=(key + "-head",)
+            )
+
+class AVLTree(BST):
+    """Self-balancing BST that keeps its height logarithmic using AVL rotations."""
+    def insert(self, value):
+        """Insert a value and rebalance the tree."""
+        self._rebalance_path(self._insert_path(value))
+
+    def delete(self, value):
+        """Delete a value and rebalance the tree."""
+        path = self._delete_path(value)
+        if path is not None:
+            self._rebalance_path(path)
+
+    def insert_steps(self, value):
+        """Insert a value step by step, yielding the comparison path and rotations."""
+        node = self.root
+        while node is not None:
+            yield ("compare", node)
+            if self.multiset and value == node.value:
+                break
+            node = node.left if value < node.value else node.right
+        for subtree in self._rebalance_path(self._insert_path(value)):
+            yield ("rotate", subtree)
+        yield ("done", None)
+
+    def delete_steps(self, value):
+        """Delete a value step by step, yielding the search path, match and rotations."""
+        node = yield from self._search_steps(value)
+        if node is not None:
+            yield ("found", node)
+            for subtree in self._rebalance_path(self._delete_path(value)):
+                yield ("rotate", subtree)
+            yield ("done", None)
+
+    def _rebalance_path(self, path):
+        """Rebalance the ancestors in path bottom-up, stopping once nothing changes.
+
+        Returns the roots of the subtrees that were rotated.
+        """
+        rotated = []
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            old_height = node.height
+            subtree = self._rebalance(node)
+            if subtree is not node:
+                self._replace_child(path[i - 1] if i else None, node, subtree)
+                rotated.append(subtree)
+            elif node.height == old_height:
+                break
+        return rotated
+
+    def height(self):
+        """Return the height of the tree, read from the cached root height."""
+        return self._node_height(self.root)
+
+    def _node_height(self, node):
+        """Get the cached height of a node (0 for an empty subtree)."""
+        return node.height if node else 0
+
+    def _update_height(self, node):
+        """Recompute a node's height and subtree size from its children."""
+        node.height = 1 + max(self._node_height(node.left), self._node_height(node.right))
+        node.size = node.count + self._size(node.left) + self._size(node.right)
+
+    def _balance_factor(self, node):
+        """Left height minus right height."""
+        return self._node_height(node.left) - self._node_height(node.right)
+
+    def _rotate_left(self, node):
+        """Rotate the subtree rooted at node to the left."""
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        node.layout = pivot.layout = None
+        if self.stats is not None:
+            self.stats.count(structural=1, rotations=1)
+        self._update_height(node)
+        self._update_height(pivot)
+        return pivot
+
+    def _rotate_right(self, node):
+        """Rotate the subtree rooted at node to the right."""
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        node.layout = pivot.layout = None
+        if self.stats is not None:
+            self.stats.count(structural=1, rotations=1)
+        self._update_height(node)
+        self._update_height(pivot)
+        return pivot
+
+    def _rebalance(self, node):
+        """Restore the AVL invariant at node and return the new subtree root."""
+        self._update_height(node)
+        balance = self._balance_factor(node)
+        if balance > 1:
+            if self._balance_factor(node.left) < 0:
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+        if balance < -1:
+            if self._balance_factor(node.right) > 0:
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+        return node
+
+class PersistentBST(BST):
+    """BST whose updates copy the search path instead of changing nodes.
+
+    insert() and delete() return a new root that shares every untouched
+    subtree with the previous version, so a version costs O(height) new
+    nodes. Nodes are never modified after they are built, which also keeps
+    each node's cached layout valid in every version that shares it. All
+    versions stay in versions for undo(), redo() and goto().
+    """
+    def __init__(self, multiset=False):
+        super().__init__(multiset)
+        self.versions = [None]
+        self.version = 0
+
+    @classmethod
+    def from_sorted(cls, values, presorted=False, multiset=False):
+        """Build a balanced tree as the first version."""
+        tree = super().from_sorted(values, presorted, multiset)
+        tree.versions = [tree.root]
+        return tree
+
+    def copy(self):
+        """Return a copy in O(versions); the nodes are shared since none ever change."""
+        tree = PersistentBST(self.multiset)
+        tree.root = self.root
+        tree.versions = list(self.versions)
+        tree.version = self.version
+        return tree
+
+    def _commit(self, root):
+        """Make root the newest version, discarding any versions after the current one."""
+        del self.versions[self.version + 1:]
+        self.versions.append(root)
+        self.version += 1
+        self.root = root
+        return root
+
+    def _clone(self, node, left, right):
+        """Return a new node with node's value and count and the given children."""
+        twin = Node(node.value)
+        twin.left = left
+        twin.right = right
+        twin.count = node.count
+        twin.size = node.count + self._size(left) + self._size(right)
+        return twin
+
+    def _insert_copy(self, root, value):
+        """Return the root of root's tree with value added, copying only its path."""
+        path = []
+        node = root
+        while node is not None and not (self.multiset and value == node.value):
+            path.append(node)
+            node = node.left if value < node.value else node.right
+
+        if node is None:
+            new = Node(value)
+        else:
+            new = self._clone(node, node.left, node.right)
+            new.count += 1
+            new.size += 1
+        for parent in reversed(path):
+            if value < parent.value:
+                new = self._clone(parent, new, parent.right)
+            else:
+                new = self._clone(parent, parent.left, new)
+        if self.stats is not None:
+            self.stats.count(comparisons=len(path), visits=len(path), structural=len(path) + 1)
+        return new
+
+    def _delete_copy(self, root, value):
+        """Return the root of root's tree without value (root itself if value is absent)."""
+        path = []
+        node = root
+        while node is not None and node.value != value:
+            path.append(node)
+            node = node.left if value < node.value else node.right
+        if node is None:
+            if self.stats is not None:
+                self.stats.count(comparisons=len(path), visits=len(path))
+            return root
+
+        copies = len(path)
+        if node.count > 1:
+            new = self._clone(node, node.left, node.right)
+            new.count -= 1
+            new.size -= 1
+            copies += 1
+        elif node.left is not None and node.right is not None:
+            # Rebuild the right subtree without its minimum, which takes node's place
+            spine = []
+            successor = node.right
+            while successor.left is not None:
+                spine.append(successor)
+                successor = successor.left
+            rest = successor.right
+            for ancestor in reversed(spine):
+                rest = self._clone(ancestor, rest, ancestor.right)
+            new = self._clone(successor, node.left, rest)
+            copies += len(spine) + 1
+        else:
+            new = node.left if node.left is not None else node.right
+
+        for parent in reversed(path):
+            if value < parent.value:
+                new = self._clone(parent, new, parent.right)
+            else:
+                new = self._clone(parent, parent.left, new)
+        if self.stats is not None:
+            self.stats.count(comparisons=len(path) + 1, visits=len(path) + 1, structural=copies)
+        return new
+
+    def insert(self, value):
+        """Insert a value as a new version and return its root."""
+        return self._commit(self._insert_copy(self.root, value))
+
+    def insert_many(self, values):
+        """Insert a batch of values as a single new version and return its root."""
+        values = sorted(values)
+        if len(values) < len(self):
+            root = self.root
+            for value in values:
+                root = self._insert_copy(root, value)
+        else:
+            root = self._build_sorted(list(heapq.merge(self.inorder(), values)))
+        return self._commit(root)
+
+    def delete(self, value):
+        """Delete a value as a new version and return its root.
+
+        Deleting a missing value leaves the history unchanged.
+        """
+        root = self._delete_copy(self.root, value)
+        if root is not self.root:
+            self._commit(root)
+        return root
+
+    def goto(self, version):
+        """Make an earlier or later version current in O(1)."""
+        if not 0 <= version < len(self.versions):
+            raise IndexError("No such version")
+        self.version = version
+        self.root = self.versions[version]
+
+    def undo(self):
+        """Step back one version. Returns False if there is nothing to undo."""
+        if self.version == 0:
+            return False
+        self.goto(self.version - 1)
+        return True
+
+    def redo(self):
+        """Step forward one version. Returns False if there is nothing to redo."""
+        if self.version == len(self.versions) - 1:
+            return False
+        self.goto(self.version + 1)
+        return True
+
+class CompactBST:
+    """Memory-compact BST for integer keys using struct-of-arrays storage.
+
+    Keys live in an array('q') and child links are int32 slot indexes into
+    parallel arrays (-1 meaning no child). Deleted slots are chained into a
+    free list through the left array and reused by later inserts.
+    """
+    def __init__(self):
+        self.keys = array('q')
+        self.left = array('i')
+        self.right = array('i')
+        self.root = -1
+        self._free = -1
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _new_slot(self, value):
+        """Store value in a free slot (or a new one) and return its index."""
+        if self._free != -1:
+            # Store first so a value the array rejects leaves the free list intact
+            index = self._free
+            self.keys[index] = value
+            self._free = self.left[index]
+            self.left[index] = -1
+            self.right[index] = -1
+        else:
+            index = len(self.keys)
+            self.keys.append(value)
+            self.left.append(-1)
+            self.right.append(-1)
+        return index
+
+    def insert(self, value):
+        """Insert a value into the tree."""
+        keys, left, right = self.keys, self.left, self.right
+        index = self._new_slot(value)
+        self._count += 1
+        if self.root == -1:
+            self.root = index
+            return
+        node = self.root
+        while True:
+            if value < keys[node]:
+                if left[node] == -1:
+                    left[node] = index
+                    return
+                node = left[node]
+            else:
+                if right[node] == -1:
+                    right[node] = index
+                    return
+                node = right[node]
+
+    def delete(self, value):
+        """Delete a value from the tree."""
+        keys, left, right = self.keys, self.left, self.right
+        parent = -1
+        node = self.root
+        while node != -1 and keys[node] != value:
+            parent = node
+            node = left[node] if value < keys[node] else right[node]
+        if node == -1:
+            return
+
+        # Two children: copy the in-order successor up and unlink it instead
+        if left[node] != -1 and right[node] != -1:
+            parent = node
+            successor = right[node]
+            while left[successor] != -1:
+                parent = successor
+                successor = left[successor]
+            keys[node] = keys[successor]
+            node = successor
+
+        child = left[node] if left[node] != -1 else right[node]
+        if parent == -1:
+            self.root = child
+        elif left[parent] == node:
+            left[parent] = child
+        else:
+            right[parent] = child
+
+        left[node] = self._free
+        right[node] = -1
+        self._free = node
+        self._count -= 1
+
+    def inorder(self):
+        """Yield the values of the tree in sorted order."""
+        keys, left, right = self.keys, self.left, self.right
+        stack = []
+        node = self.root
+        while stack or node != -1:
+            while node != -1:
+                stack.append(node)
+                node = left[node]
+            node = stack.pop()
+            yield keys[node]
+            node = right[node]
+
+    def inorder_list(self):
+        """Return the inorder traversal of the tree as a list."""
+        return list(self.inorder())
+
+    def bytes_per_element(self):
+        """Return the storage bytes used per stored key (including free slots)."""
+        if not self._count:
+            return 0.0
+        total = sum(sys.getsizeof(a) for a in (self.keys, self.left, self.right))
+        return total / self._count
+
+# --- B-Tree Implementation ---
+class BTreeNode:
+    """A B-tree node: sorted keys and, for internal nodes, len(keys) + 1 children."""
+    __slots__ = ("keys", "children")
+
+    def __init__(self, keys=None, children=None):
+        self.keys = keys if keys is not None else []
+        self.children = children if children is not None else []
+
+class BTree:
+    """B-tree of minimum degree t, storing each distinct key once.
+
+    Every node except the root holds between t - 1 and 2t - 1 keys, so a
+    lookup touches O(log_t n) nodes and scans each one with a binary search
+    over a contiguous list. Insert splits full nodes on the way down and
+    delete merges or borrows on the way down, so neither has to back up.
+    """
+    stats = None  # Optional Instrumentation
+
+    def __init__(self, min_degree=3):
+        if min_degree < 2:
+            raise ValueError("min_degree must be at least 2")
+        self.t = min_degree
+        self.root = BTreeNode()
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, key):
+        return self.search(key) is not None
+
+    def copy(self):
+        """Return a structural copy of the tree in O(n)."""
+        tree = BTree(self.t)
+        tree.size = self.size
+        tree.root = BTreeNode(list(self.root.keys))
+        stack = [(self.root, tree.root)]
+        while stack:
+            node, twin = stack.pop()
+            for child in node.children:
+                clone = BTreeNode(list(child.keys))
+                twin.children.append(clone)
+                stack.append((child, clone))
+        return tree
+
+    def search(self, key):
+        """Return (node, index) of key, or None if it is not in the tree."""
+        node = self.root
+        visits = comparisons = 0
+        while True:
+            visits += 1
+            i = bisect_left(node.keys, key)
+            if self.stats is not None:
+                comparisons += self._bisect_probes(len(node.keys), i) + (i < len(node.keys))
+            if i < len(node.keys) and node.keys[i] == key:
+                break
+            if not node.children:
+                node = None
+                break
+            node = node.children[i]
+        if self.stats is not None:
+            self.stats.count(comparisons=comparisons, visits=visits)
+        return (node, i) if node is not None else None
+
+    @staticmethod
+    def _bisect_probes(n, i):
+        """Return how many keys bisect_left compared to land on index i of n keys."""
+        # The probe path depends only on where the search ends, so replay it on indices
+        probes = 0
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if mid < i:
+                lo = mid + 1
+            else:
+                hi = mid
+            probes += 1
+        return probes
+
+    def _search_steps(self, key):
+        """Yield ("compare", node) for each node on the search path of key."""
+        node = self.root
+        while True:
+            yield ("compare", node)
+            i = bisect_left(node.keys, key)
+            if (i < len(node.keys) and node.keys[i] == key) or not node.children:
+                return
+            node = node.children[i]
+
+    def insert(self, key):
+        """Insert key. Returns False if it was already present.
+
+        A duplicate is caught during the single descent; any full node split
+        on the way down before it is found leaves a valid tree behind.
+        """
+        full = 2 * self.t - 1
+        root = self.root
+        if len(root.keys) == full and key not in root.keys:
+            self.root = BTreeNode(children=[root])
+            self._split_child(self.root, 0)
+        node = self.root
+        visits = comparisons = 0
+        found = False
+        while True:
+            visits += 1
+            keys = node.keys
+            i = bisect_left(keys, key)
+            if self.stats is not None:
+                comparisons += self._bisect_probes(len(keys), i) + (i < len(keys))
+            if i < len(keys) and keys[i] == key:
+                found = True
+                break
+            if not node.children:
+                break
+            if len(node.children[i].keys) == full:
+                self._split_child(node, i)
+                if key == keys[i]:
+                    found = True
+                    break
+                if key > keys[i]:
+                    i += 1
+            node = node.children[i]
+        if self.stats is not None:
+            self.stats.count(comparisons=comparisons, visits=visits)
+        if found:
+            return False
+        keys.insert(i, key)
+        self.size += 1
+        if self.stats is not None:
+            self.stats.count(structural=1)
+        return True
+
+    def insert_many(self, keys):
+        """Insert a batch of keys."""
+        for key in keys:
+            self.insert(key)
+
+    def insert_steps(self, key):
+        """Show the search path of key, then insert it."""
+        yield from self._search_steps(key)
+        self.insert(key)
+        yield ("done", None)
+
+    def _split_child(self, parent, i):
+        """Split the full child parent.children[i] around its median key."""
+        t = self.t
+        child = parent.children[i]
+        right = BTreeNode(child.keys[t:], child.children[t:])
+        parent.keys.insert(i, child.keys[t - 1])
+        parent.children.insert(i + 1, right)
+        del child.keys[t - 1:]
+        del child.children[t:]
+        if self.stats is not None:
+            self.stats.count(structural=1)
+
+    def delete(self, key):
+        """Delete key. Returns False if it was not present.
+
+        A missing key is found at the leaf the single descent ends in; the
+        merges and borrows made on the way there leave a valid tree behind.
+        """
+        t = self.t
+        node = self.root
+        visits = comparisons = 0
+        while True:
+            visits += 1
+            i = bisect_left(node.keys, key)
+            if self.stats is not None:
+                comparisons += self._bisect_probes(len(node.keys), i) + (i < len(node.keys))
+            if i < len(node.keys) and node.keys[i] == key:
+                if not node.children:
+                    del node.keys[i]
+                    break
+                left, right = node.children[i], node.children[i + 1]
+                if len(left.keys) >= t:
+                    # Replace key by its predecessor and delete that from the left
+                    key = self._max_key(left)
+                    node.keys[i] = key
+                    node = left
+                elif len(right.keys) >= t:
+                    key = self._min_key(right)
+                    node.keys[i] = key
+                    node = right
+                else:
+                    self._merge(node, i)
+                    node = left
+            elif not node.children:
+                if self.stats is not None:
+                    self.stats.count(comparisons=comparisons, visits=visits)
+                return False
+            else:
+                # Make sure the child we descend into can spare a key
+                if len(node.children[i].keys) == t - 1:
+                    i = self._fill(node, i)
+                node = node.children[i]
+            if not self.root.keys and self.root.children:
+                self.root = self.root.children[0]
+        self.size -= 1
+        if self.stats is not None:
+            self.stats.count(comparisons=comparisons, visits=visits, structural=1)
+        return True
+
+    def delete_steps(self, key):
+        """Show the search path of key, then delete it."""
+        yield from self._search_steps(key)
+        self.delete(key)
+        yield ("done", None)
+
+    def _fill(self, node, i):
+        """Give node.children[i] a t-th key by borrowing or merging; return its new index."""
+        t = self.t
+        child = node.children[i]
+        if self.stats is not None:
+            self.stats.count(structural=1)
+        if i > 0 and len(node.children[i - 1].keys) >= t:
+            left = node.children[i - 1]
+            child.keys.insert(0, node.keys[i - 1])
+            node.keys[i - 1] = left.keys.pop()
+            if left.children:
+                child.children.insert(0, left.children.pop())
+            return i
+        if i < len(node.keys) and len(node.children[i + 1].keys) >= t:
+            right = node.children[i + 1]
+            child.keys.append(node.keys[i])
+            node.keys[i] = right.keys.pop(0)
+            if right.children:
+                child.children.append(right.children.pop(0))
+            return i
+        if i < len(node.keys):
+            self._merge(node, i)
+            return i
+        self._merge(node, i - 1)
+        return i - 1
+
+    def _merge(self, node, i):
+        """Merge children i and i + 1 of node around the key between them."""
+        left = node.children[i]
+        right = node.children.pop(i + 1)
+        left.keys.append(node.keys.pop(i))
+        left.keys.extend(right.keys)
+        left.children.extend(right.children)
+
+    def _min_key(self, node):
+        """Return the smallest key in the subtree rooted at node."""
+        while node.children:
+            node = node.children[0]
+        return node.keys[0]
+
+    def _max_key(self, node):
+        """Return the largest key in the subtree rooted at node."""
+        while node.children:
+            node = node.children[-1]
+        return node.keys[-1]
+
+    def random_value(self, rng=random):
+        """Return a random key by a random walk from the root (not uniform)."""
+        if not self.size:
+            raise IndexError("Cannot choose from an empty B-tree")
+        node = self.root
+        while node.children:
+            i = rng.randrange(len(node.keys) + len(node.children))
+            if i < len(node.keys):
+                return node.keys[i]
+            node = node.children[i - len(node.keys)]
+        return rng.choice(node.keys)
+
+    def inorder(self):
+        """Yield the keys of the tree in sorted order."""
+        stack = [(self.root, 0)]
+        while stack:
+            node, i = stack.pop()
+            if not node.children:
+                yield from node.keys
+                continue
+            if i < len(node.keys):
+                stack.append((node, i + 1))
+            stack.append((node.children[i], 0))
+            if i > 0:
+                yield node.keys[i - 1]
+
+    def inorder_list(self):
+        """Return the inorder traversal as a list."""
+        return list(self.inorder())
+
+    def height(self):
+        """Return the height of the tree (number of levels)."""
+        if not self.size:
+            return 0
+        height = 1
+        node = self.root
+        while node.children:
+            node = node.children[0]
+            height += 1
+        return height
+
+    def draw(self, canvas, colors=None, highlight=(), width=None):
+        """Draw the tree as rows of multi-key nodes, filling nodes in highlight with the accent color.
+
+        Only the levels whose nodes fit across the canvas are drawn; the
+        keys below them are summarised as a count.
+        """
+        width = width or 900
+        key_width = 28
+        level_gap = 80
+        node_gap = 12
+        primary = colors['primary'] if colors else "#6c5ce7"
+        secondary = colors['secondary'] if colors else "#a8a5e6"
+        accent = colors.get('accent', "#00cec9") if colors else "#00cec9"
+
+        # Draw B-tree title
+        canvas.create_text(
+            400, 50,
+            text=f"B-Tree Visualization (t = {self.t})",
+            fill=primary,
+            font=("Segoe UI", 24, "bold"),
+            tags=("title",)
         )
+        if not self.size:
+            return
+
+        # Keep the deepest level whose nodes still fit side by side
+        levels = [[self.root]]
+        while levels[-1][0].children and len(levels) < 8:
+            below = [child for node in levels[-1] for child in node.children]
+            if sum(len(node.keys) * key_width + node_gap for node in below) > width - 40:
+                break
+            levels.append(below)
+
+        # Lay the bottom level out left to right and centre parents over children
+        spans = {}
+        x = 0
+        for node in levels[-1]:
+            w = len(node.keys) * key_width
+            spans[id(node)] = (x, x + w)
+            x += w + node_gap
+        offset = (width - (x - node_gap)) / 2
+        for row in reversed(levels[:-1]):
+            for node in row:
+                left = spans[id(node.children[0])][0]
+                right = spans[id(node.children[-1])][1]
+                w = len(node.keys) * key_width
+                spans[id(node)] = ((left + right - w) / 2, (left + right + w) / 2)
+
+        for depth, row in enumerate(levels):
+            y = 110 + depth * level_gap
+            for node in row:
+                x1, x2 = (v + offset for v in spans[id(node)])
+                if depth + 1 < len(levels):
+                    for j, child in enumerate(node.children):
+                        cx1, cx2 = (v + offset for v in spans[id(child)])
+                        canvas.create_line(
+                            x1 + j * key_width, y + 14, (cx1 + cx2) / 2, y + level_gap - 14,
+                            fill=secondary,
+                            width=2,
+                            tags=(f"bedge{id(child)}-line",)
+                        )
+                canvas.create_rectangle(
+                    x1, y - 14, x2, y + 14,
+                    fill=accent if node in highlight else primary,
+                    outline=secondary,
+                    width=2,
+                    tags=(f"bnode{id(node)}-rect",)
+                )
+                canvas.create_text(
+                    (x1 + x2) / 2, y,
+                    text=" ".join(str(key) for key in node.keys),
+                    fill="white",
+                    font=("Segoe UI", 9, "bold"),
+                    tags=(f"bnode{id(node)}-text",)
+                )
+
+        if levels[-1][0].children:
+            shown = sum(len(node.keys) for row in levels for node in row)
+            canvas.create_text(
+                400, 110 + len(levels) * level_gap,
+                text=f"+{self.size - shown} keys in {self.height() - len(levels)} deeper levels",
+                fill=secondary,
+                font=("Segoe UI", 11),
+                tags=("hidden",)
+            )
 
 # --- Stack Visualization ---
 class Stack:
     """Visualize Stack with bars."""
+    stats = None  # Optional Instrumentation
+
     def __init__(self):
         self.items = []
 
+    def __len__(self):
+        return len(self.items)
+
+    def copy(self):
+        """Return a copy of the stack."""
+        stack = Stack()
+        stack.items = list(self.items)
+        return stack
+
     def push(self, item):
         """Push an item onto the stack."""
         self.items.append(item)
+        if self.stats is not None:
+            self.stats.count(structural=1)
+
+    def push_many(self, items):
+        """Push a batch of items, the last one ending up on top."""
+        size = len(self.items)
+        self.items.extend(items)
+        if self.stats is not None:
+            self.stats.count(structural=len(self.items) - size)
+
+    def push_steps(self, item):
+        """Push an item, then yield a step highlighting the new top."""
+        self.push(item)
+        yield ("push", 0)
+
+    def pop_steps(self):
+        """Yield a step highlighting the top item, then pop it."""
+        if self.items:
+            yield ("pop", 0)
+            self.pop()
+            yield ("done", None)
 
     def pop(self):
         """Pop an item from the stack."""
         if self.items:
+            if self.stats is not None:
+                self.stats.count(structural=1)
             return self.items.pop()
 
-    def draw(self, canvas, colors=None):
-        """Draw the stack on the canvas."""
+    def draw(self, canvas, colors=None, highlight=(), width=None):
+        """Draw the stack on the canvas, filling slots in highlight with the accent color.
+
+        If width is given, items that would start past it are not drawn.
+        """
         bar_width = 60
         bar_gap = 15
         y_pos = 300
+        slots = len(self) if width is None else max(0, int((width - 100) // (bar_width + bar_gap)) + 1)
         
         # Draw stack base shadow
         canvas.create_rectangle(
             52, y_pos + 32,
             752, y_pos + 42,
             fill="#dfe6e9",
-            outline=""
+            outline="",
+            tags=("base-shadow",)
         )
         
         # Draw stack base
@@ -183,7 +1729,8 @@ class Stack:
             750, y_pos + 40,
             fill=colors['secondary'] if colors else "#686de0",
             outline=colors['primary'] if colors else "#4834d4",
-            width=2
+            width=2,
+            tags=("base",)
         )
         
         # Draw stack title
@@ -191,10 +1738,11 @@ class Stack:
             400, 50,
             text="Stack Visualization",
             fill=colors['primary'] if colors else "#4834d4",
-            font=("Segoe UI", 24, "bold")
+            font=("Segoe UI", 24, "bold"),
+            tags=("title",)
         )
         
-        for i, item in enumerate(reversed(self.items)):
+        for i, item in enumerate(islice(reversed(self.items), slots)):
             # Draw shadow
             canvas.create_rectangle(
                 102 + i * (bar_width + bar_gap),
@@ -202,7 +1750,8 @@ class Stack:
                 102 + (i + 1) * bar_width + i * bar_gap,
                 y_pos + 27,
                 fill="#dfe6e9",
-                outline=""
+                outline="",
+                tags=(f"slot{i}-shadow",)
             )
             
             # Draw stack element
@@ -211,96 +1760,1942 @@ class Stack:
                 y_pos - 25,
                 100 + (i + 1) * bar_width + i * bar_gap,
                 y_pos + 25,
-                fill=colors['primary'] if colors else "#4834d4",
+                fill=(
+                    (colors.get('accent', "#00cec9") if colors else "#00cec9") if i in highlight
+                    else (colors['primary'] if colors else "#4834d4")
+                ),
+                outline=colors['secondary'] if colors else "#686de0",
+                width=2,
+                tags=(f"slot{i}-bar",)
+            )
+            canvas.create_text(
+                100 + (i + 0.5) * bar_width + i * bar_gap,
+                y_pos,
+                text=str(item),
+                fill="white",
+                font=("Segoe UI", 12, "bold"),
+                tags=(f"slot{i}-text",)
+            )
+
+# --- Queue Visualization ---
+class Queue:
+    """Visualize Queue with bars.
+
+    Items live in a growable ring buffer, so enqueue and dequeue are O(1)
+    amortized instead of shifting a list on every dequeue.
+    """
+    stats = None  # Optional Instrumentation
+
+    def __init__(self, capacity=8):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self._buffer = [None] * capacity
+        self._head = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def copy(self):
+        """Return a copy of the queue."""
+        queue = Queue()
+        queue.enqueue_many(self)
+        return queue
+
+    def __iter__(self):
+        """Iterate over the items from front to back."""
+        buffer = self._buffer
+        capacity = len(buffer)
+        for i in range(self._size):
+            yield buffer[(self._head + i) % capacity]
+
+    def enqueue(self, item):
+        """Add an item to the queue."""
+        if self._size == len(self._buffer):
+            self._resize(2 * len(self._buffer))
+        self._buffer[(self._head + self._size) % len(self._buffer)] = item
+        self._size += 1
+        if self.stats is not None:
+            self.stats.count(structural=1)
+
+    def enqueue_many(self, items):
+        """Add a batch of items, growing the buffer at most once."""
+        items = list(items)
+        capacity = len(self._buffer)
+        if self._size + len(items) > capacity:
+            while self._size + len(items) > capacity:
+                capacity *= 2
+            self._resize(capacity)
+        for item in items:
+            self._buffer[(self._head + self._size) % capacity] = item
+            self._size += 1
+        if self.stats is not None:
+            self.stats.count(structural=len(items))
+
+    def peek(self):
+        """Return the front item without removing it."""
+        if self._size:
+            return self._buffer[self._head]
+
+    def enqueue_steps(self, item):
+        """Add an item, then yield a step highlighting it at the back."""
+        self.enqueue(item)
+        yield ("enqueue", self._size - 1)
+
+    def dequeue_steps(self):
+        """Yield a step highlighting the front item, remove it, then show the shift."""
+        if self._size:
+            yield ("dequeue", 0)
+            self.dequeue()
+            yield ("shift", None)
+
+    def dequeue(self):
+        """Remove an item from the queue."""
+        if self._size:
+            item = self._buffer[self._head]
+            self._buffer[self._head] = None
+            self._head = (self._head + 1) % len(self._buffer)
+            self._size -= 1
+            if self.stats is not None:
+                self.stats.count(structural=1)
+            if 8 < len(self._buffer) and self._size <= len(self._buffer) // 4:
+                self._resize(len(self._buffer) // 2)
+            return item
+
+    def _resize(self, capacity):
+        """Copy the items, front first, into a new buffer of the given capacity."""
+        items = list(self)
+        self._buffer = items + [None] * (capacity - len(items))
+        self._head = 0
+
+    def draw(self, canvas, colors=None, highlight=(), width=None):
+        """Draw the queue on the canvas, filling slots in highlight with the accent color.
+
+        If width is given, items that would start past it are not drawn.
+        """
+        bar_width = 60
+        bar_gap = 15
+        y_pos = 300
+        slots = len(self) if width is None else max(0, int((width - 100) // (bar_width + bar_gap)) + 1)
+        
+        # Draw queue base shadow
+        canvas.create_rectangle(
+            52, y_pos + 32,
+            752, y_pos + 42,
+            fill="#dfe6e9",
+            outline="",
+            tags=("base-shadow",)
+        )
+        
+        # Draw queue base
+        canvas.create_rectangle(
+            50, y_pos + 30,
+            750, y_pos + 40,
+            fill=colors['secondary'] if colors else "#686de0",
+            outline=colors['primary'] if colors else "#4834d4",
+            width=2,
+            tags=("base",)
+        )
+        
+        # Draw queue title
+        canvas.create_text(
+            400, 50,
+            text="Queue Visualization",
+            fill=colors['primary'] if colors else "#4834d4",
+            font=("Segoe UI", 24, "bold"),
+            tags=("title",)
+        )
+        
+        for i, item in enumerate(islice(self, slots)):
+            # Draw shadow
+            canvas.create_rectangle(
+                102 + i * (bar_width + bar_gap),
+                y_pos - 23,
+                102 + (i + 1) * bar_width + i * bar_gap,
+                y_pos + 27,
+                fill="#dfe6e9",
+                outline="",
+                tags=(f"slot{i}-shadow",)
+            )
+            
+            # Draw queue element
+            canvas.create_rectangle(
+                100 + i * (bar_width + bar_gap),
+                y_pos - 25,
+                100 + (i + 1) * bar_width + i * bar_gap,
+                y_pos + 25,
+                fill=(
+                    (colors.get('accent', "#00cec9") if colors else "#00cec9") if i in highlight
+                    else (colors['primary'] if colors else "#4834d4")
+                ),
                 outline=colors['secondary'] if colors else "#686de0",
-                width=2
+                width=2,
+                tags=(f"slot{i}-bar",)
             )
             canvas.create_text(
                 100 + (i + 0.5) * bar_width + i * bar_gap,
                 y_pos,
                 text=str(item),
                 fill="white",
-                font=("Segoe UI", 12, "bold")
+                font=("Segoe UI", 12, "bold"),
+                tags=(f"slot{i}-text",)
             )
 
-# --- Queue Visualization ---
-class Queue:
-    """Visualize Queue with bars."""
-    def __init__(self):
-        self.items = []
+# --- Binary Heap Visualization ---
+class BinaryHeap:
+    """Array-backed binary min-heap used as a priority queue.
+
+    The children of items[i] are items[2i + 1] and items[2i + 2]. With
+    indexed=True a position index maps each item to its slot so that
+    decrease_key() runs in O(log n); items must then be distinct.
+    """
+    stats = None  # Optional Instrumentation
+
+    def __init__(self, indexed=False):
+        self.items = []
+        self.positions = {} if indexed else None
+
+    def __len__(self):
+        return len(self.items)
+
+    @classmethod
+    def heapify(cls, values, indexed=False):
+        """Build a heap from values in O(n)."""
+        heap = cls(indexed)
+        heap.items = list(values)
+        heap._heapify()
+        return heap
+
+    def _heapify(self):
+        """Restore the heap property over the whole array bottom-up."""
+        for i in range(len(self.items) // 2 - 1, -1, -1):
+            self._sift_down(i)
+        if self.positions is not None:
+            self.positions = {item: i for i, item in enumerate(self.items)}
+
+    def copy(self):
+        """Return a copy of the heap."""
+        heap = BinaryHeap(self.positions is not None)
+        heap.items = list(self.items)
+        if self.positions is not None:
+            heap.positions = dict(self.positions)
+        return heap
+
+    def peek(self):
+        """Return the smallest item without removing it."""
+        if self.items:
+            return self.items[0]
+
+    def push(self, item):
+        """Add an item to the heap."""
+        self.items.append(item)
+        self._sift_up(len(self.items) - 1)
+
+    def push_many(self, items):
+        """Add a batch of items, re-heapifying in O(n) when the batch is large."""
+        items = list(items)
+        if len(items) < len(self.items):
+            for item in items:
+                self.push(item)
+        else:
+            self.items.extend(items)
+            self._heapify()
+
+    def pop(self):
+        """Remove and return the smallest item."""
+        if not self.items:
+            return None
+        last = self.items.pop()
+        if not self.items:
+            if self.positions is not None:
+                del self.positions[last]
+            return last
+        top = self.items[0]
+        if self.positions is not None:
+            del self.positions[top]
+        self.items[0] = last
+        self._sift_down(0)
+        return top
+
+    def push_pop(self, item):
+        """Push item then pop the smallest, faster than the two calls."""
+        if self.items and self.items[0] < item:
+            top = self.items[0]
+            if self.positions is not None:
+                del self.positions[top]
+            self.items[0] = item
+            self._sift_down(0)
+            return top
+        return item
+
+    def decrease_key(self, item, new_item):
+        """Replace item with a smaller new_item and move it up; needs indexed=True."""
+        if self.positions is None:
+            raise ValueError("decrease_key needs a heap created with indexed=True")
+        if new_item > item:
+            raise ValueError("new_item must not be greater than item")
+        i = self.positions.pop(item)
+        self.items[i] = new_item
+        self._sift_up(i)
+
+    def _sift_up(self, i):
+        """Move items[i] up until its parent is not greater."""
+        items = self.items
+        item = items[i]
+        comparisons = moves = 0
+        while i > 0:
+            parent = (i - 1) // 2
+            comparisons += 1
+            if not item < items[parent]:
+                break
+            items[i] = items[parent]
+            moves += 1
+            if self.positions is not None:
+                self.positions[items[i]] = i
+            i = parent
+        items[i] = item
+        if self.positions is not None:
+            self.positions[item] = i
+        if self.stats is not None:
+            self.stats.count(comparisons=comparisons, structural=moves)
+
+    def _sift_down(self, i):
+        """Move items[i] down until neither child is smaller."""
+        items = self.items
+        n = len(items)
+        item = items[i]
+        comparisons = moves = 0
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            if child + 1 < n:
+                comparisons += 1
+                if items[child + 1] < items[child]:
+                    child += 1
+            comparisons += 1
+            if not items[child] < item:
+                break
+            items[i] = items[child]
+            moves += 1
+            if self.positions is not None:
+                self.positions[items[i]] = i
+            i = child
+        items[i] = item
+        if self.positions is not None:
+            self.positions[item] = i
+        if self.stats is not None:
+            self.stats.count(comparisons=comparisons, structural=moves)
+
+    def push_steps(self, item):
+        """Push an item, yielding each slot it passes through on the way up."""
+        self.items.append(item)
+        i = len(self.items) - 1
+        if self.positions is not None:
+            self.positions[item] = i
+        yield ("push", i)
+        while i > 0:
+            parent = (i - 1) // 2
+            if self.stats is not None:
+                self.stats.count(comparisons=1)
+            if not self.items[i] < self.items[parent]:
+                break
+            self._swap(i, parent)
+            i = parent
+            yield ("swap", i)
+
+    def pop_steps(self):
+        """Pop the smallest item, yielding each slot the last item sinks through."""
+        if not self.items:
+            return
+        yield ("pop", 0)
+        top = self.items[0]
+        self._swap(0, len(self.items) - 1)
+        self.items.pop()
+        if self.positions is not None:
+            del self.positions[top]
+        i = 0
+        n = len(self.items)
+        while 2 * i + 1 < n:
+            child = 2 * i + 1
+            if self.stats is not None:
+                self.stats.count(comparisons=2 if child + 1 < n else 1)
+            if child + 1 < n and self.items[child + 1] < self.items[child]:
+                child += 1
+            if not self.items[child] < self.items[i]:
+                break
+            self._swap(i, child)
+            i = child
+            yield ("swap", i)
+
+    def _swap(self, i, j):
+        """Swap two slots, keeping the position index in sync."""
+        items = self.items
+        items[i], items[j] = items[j], items[i]
+        if self.stats is not None:
+            self.stats.count(structural=1)
+        if self.positions is not None:
+            self.positions[items[i]] = i
+            self.positions[items[j]] = j
+
+    def draw(self, canvas, colors=None, highlight=(), width=None):
+        """Draw the heap as the implicit tree over its array, plus the array itself.
+
+        Levels whose nodes would be closer than 30 pixels are left out and
+        summarised as a count of hidden items.
+        """
+        width = width or 900
+        left = 50
+        span = width - 2 * left
+        level_gap = 70
+        primary = colors['primary'] if colors else "#6c5ce7"
+        secondary = colors['secondary'] if colors else "#a8a5e6"
+        accent = colors.get('accent', "#00cec9") if colors else "#00cec9"
+
+        # Draw heap title
+        canvas.create_text(
+            400, 50,
+            text="Binary Heap Visualization",
+            fill=primary,
+            font=("Segoe UI", 24, "bold"),
+            tags=("title",)
+        )
+
+        # Only draw as many levels as fit side by side
+        levels = 0
+        while levels < 7 and span / 2 ** levels >= 30:
+            levels += 1
+        shown = min(len(self.items), 2 ** levels - 1)
+
+        def position(i):
+            level = (i + 1).bit_length() - 1
+            slot = i + 1 - 2 ** level
+            return left + (slot + 0.5) * span / 2 ** level, 110 + level * level_gap
+
+        for i in range(1, shown):
+            x1, y1 = position((i - 1) // 2)
+            x2, y2 = position(i)
+            canvas.create_line(x1, y1, x2, y2, fill=secondary, width=2, tags=(f"heap{i}-edge",))
+
+        for i in range(shown):
+            x, y = position(i)
+            radius = min(22, span / 2 ** ((i + 1).bit_length() - 1) / 2 - 2)
+            canvas.create_oval(
+                x - radius, y - radius, x + radius, y + radius,
+                fill=accent if i in highlight else primary,
+                outline=secondary,
+                width=2,
+                tags=(f"heap{i}-circle",)
+            )
+            canvas.create_text(
+                x, y,
+                text=str(self.items[i]),
+                fill="white",
+                font=("Segoe UI", 10 if radius >= 15 else 7, "bold"),
+                tags=(f"heap{i}-text",)
+            )
+
+        if len(self.items) > shown:
+            canvas.create_text(
+                400, 110 + levels * level_gap,
+                text=f"+{len(self.items) - shown} more items in deeper levels",
+                fill=secondary,
+                font=("Segoe UI", 11),
+                tags=("hidden",)
+            )
+
+        # Draw the backing array as a strip of cells
+        cell = 40
+        y_pos = 640
+        for i, item in enumerate(islice(self.items, int(span // cell))):
+            x = left + i * cell
+            canvas.create_rectangle(
+                x, y_pos - 18, x + cell, y_pos + 18,
+                fill=accent if i in highlight else "white",
+                outline=primary,
+                width=1,
+                tags=(f"cell{i}-rect",)
+            )
+            canvas.create_text(
+                x + cell / 2, y_pos,
+                text=str(item),
+                fill=primary,
+                font=("Segoe UI", 10),
+                tags=(f"cell{i}-text",)
+            )
+
+# --- Hash Table Visualization ---
+class _ProbeTable:
+    """Flat Robin Hood table: keys plus the probe distance of each slot (-1 = empty)."""
+    __slots__ = ("keys", "dist", "mask", "count")
+
+    def __init__(self, capacity):
+        self.keys = [None] * capacity
+        self.dist = array('i', [-1]) * capacity
+        self.mask = capacity - 1
+        self.count = 0
+
+    def find(self, key, h):
+        """Return the slot holding key, or -1, and the number of slots probed."""
+        keys, dist, mask = self.keys, self.dist, self.mask
+        i = h & mask
+        d = 0
+        # A slot closer to its home than we are to ours ends the search
+        while dist[i] >= d:
+            if keys[i] == key:
+                return i, d + 1
+            i = (i + 1) & mask
+            d += 1
+        return -1, d + 1
+
+    def add(self, key, h):
+        """Place a key known to be absent, displacing richer keys. Returns slots probed."""
+        keys, dist, mask = self.keys, self.dist, self.mask
+        i = h & mask
+        d = 0
+        probes = 1
+        while dist[i] >= 0:
+            if dist[i] < d:
+                keys[i], key = key, keys[i]
+                dist[i], d = d, dist[i]
+            i = (i + 1) & mask
+            d += 1
+            probes += 1
+        keys[i] = key
+        dist[i] = d
+        self.count += 1
+        return probes
+
+    def remove(self, i):
+        """Empty slot i, shifting the rest of its cluster back one slot."""
+        keys, dist, mask = self.keys, self.dist, self.mask
+        j = (i + 1) & mask
+        while dist[j] > 0:
+            keys[i] = keys[j]
+            dist[i] = dist[j] - 1
+            i = j
+            j = (j + 1) & mask
+        keys[i] = None
+        dist[i] = -1
+        self.count -= 1
+
+class HashTable:
+    """Open-addressing hash set using Robin Hood linear probing.
+
+    When the load factor passes max_load a table twice the size is
+    allocated, and every later operation moves migrate_step slots of the
+    old table into it, so no single insert pays for a full rehash. Lookups
+    check both tables while a resize is in progress.
+    """
+    stats = None  # Optional Instrumentation
+
+    def __init__(self, capacity=8, max_load=0.75, migrate_step=16):
+        if capacity & (capacity - 1) or capacity < 2:
+            raise ValueError("capacity must be a power of two")
+        if not 0 < max_load < 1:
+            raise ValueError("max_load must be between 0 and 1")
+        self.max_load = max_load
+        self.migrate_step = max(2, migrate_step)
+        self._table = _ProbeTable(capacity)
+        self._old = None
+        self._cursor = 0
+
+    def __len__(self):
+        return self._table.count + (self._old.count if self._old is not None else 0)
+
+    def __iter__(self):
+        for table in (self._old, self._table):
+            if table is not None:
+                for key, d in zip(table.keys, table.dist):
+                    if d >= 0:
+                        yield key
+
+    def __contains__(self, key):
+        return self._locate(key, hash(key))[0] is not None
+
+    @property
+    def capacity(self):
+        return self._table.mask + 1
+
+    @property
+    def resizing(self):
+        return self._old is not None
+
+    def load_factor(self):
+        """Return the fraction of slots in use across both tables."""
+        slots = self.capacity + (self._old.mask + 1 if self._old is not None else 0)
+        return len(self) / slots
+
+    def copy(self):
+        """Return a copy of the table, including any resize in progress."""
+        table = HashTable(self.capacity, self.max_load, self.migrate_step)
+        for source, name in ((self._table, "_table"), (self._old, "_old")):
+            if source is not None:
+                clone = _ProbeTable(source.mask + 1)
+                clone.keys = list(source.keys)
+                clone.dist = array('i', source.dist)
+                clone.count = source.count
+                setattr(table, name, clone)
+        table._cursor = self._cursor
+        return table
+
+    def _locate(self, key, h):
+        """Return (table, slot) for key, or (None, -1), searching both tables."""
+        slot, probes = self._table.find(key, h)
+        table = self._table if slot >= 0 else None
+        if table is None and self._old is not None:
+            slot, extra = self._old.find(key, h)
+            probes += extra
+            table = self._old if slot >= 0 else None
+        if self.stats is not None:
+            self.stats.count(comparisons=probes, visits=probes)
+        return table, slot
+
+    def _migrate(self):
+        """Move the next migrate_step slots of the old table into the new one."""
+        old = self._old
+        if old is None:
+            return
+        end = min(self._cursor + self.migrate_step, old.mask + 1)
+        moved = 0
+        for i in range(self._cursor, end):
+            # Removing shifts the next key of the cluster into slot i
+            while old.dist[i] >= 0:
+                key = old.keys[i]
+                old.remove(i)
+                self._table.add(key, hash(key))
+                moved += 1
+        self._cursor = end
+        if self.stats is not None:
+            self.stats.count(structural=moved)
+        if old.count == 0 or end > old.mask:
+            self._old = None
+            self._cursor = 0
+
+    def _grow_if_needed(self):
+        """Start an incremental resize once the load factor passes max_load."""
+        if self._old is None and self._table.count > self.max_load * self.capacity:
+            self._old = self._table
+            self._table = _ProbeTable(self.capacity * 2)
+            self._cursor = 0
+
+    def insert(self, key):
+        """Add key to the set. Returns False if it was already present."""
+        self._migrate()
+        h = hash(key)
+        if self._locate(key, h)[0] is not None:
+            return False
+        probes = self._table.add(key, h)
+        if self.stats is not None:
+            self.stats.count(visits=probes, structural=1)
+        self._grow_if_needed()
+        return True
+
+    def insert_many(self, keys):
+        """Add a batch of keys."""
+        for key in keys:
+            self.insert(key)
+
+    def delete(self, key):
+        """Remove key from the set. Returns False if it was not present."""
+        self._migrate()
+        table, slot = self._locate(key, hash(key))
+        if table is None:
+            return False
+        table.remove(slot)
+        if self.stats is not None:
+            self.stats.count(structural=1)
+        if self._old is not None and self._old.count == 0:
+            self._old = None
+            self._cursor = 0
+        return True
+
+    def random_value(self, rng=random):
+        """Return a random key by sampling slots, or None if the table is empty."""
+        tables = [t for t in (self._table, self._old) if t is not None and t.count]
+        if not tables:
+            return None
+        table = tables[0] if len(tables) == 1 or rng.random() * len(self) < tables[0].count else tables[1]
+        start = rng.randrange(table.mask + 1)
+        for offset in range(table.mask + 1):
+            i = (start + offset) & table.mask
+            if table.dist[i] >= 0:
+                return table.keys[i]
+
+    def insert_steps(self, key):
+        """Insert key, yielding each slot of the live table it is compared with."""
+        self._migrate()
+        h = hash(key)
+        table = self._table
+        i = h & table.mask
+        d = 0
+        while table.dist[i] >= d:
+            yield ("probe", i)
+            if table.keys[i] == key:
+                yield ("found", i)
+                return
+            i = (i + 1) & table.mask
+            d += 1
+        if self._old is not None and self._old.find(key, h)[0] >= 0:
+            return
+        table.add(key, h)
+        if self.stats is not None:
+            self.stats.count(comparisons=d + 1, structural=1)
+        yield ("found", self._table.find(key, h)[0])
+        self._grow_if_needed()
+
+    def delete_steps(self, key):
+        """Delete key, yielding each slot of the live table it is compared with."""
+        h = hash(key)
+        table = self._table
+        i = h & table.mask
+        d = 0
+        while table.dist[i] >= d:
+            yield ("probe", i)
+            if table.keys[i] == key:
+                yield ("found", i)
+                break
+            i = (i + 1) & table.mask
+            d += 1
+        self.delete(key)
+        yield ("done", None)
+
+    def draw(self, canvas, colors=None, highlight=(), width=None):
+        """Draw the buckets as a strip of cells colored by probe distance.
+
+        Tables with more slots than fit on screen are shown in groups, each
+        cell colored by the longest probe distance among its slots, so long
+        clusters stay visible at any size.
+        """
+        width = width or 900
+        primary = colors['primary'] if colors else "#6c5ce7"
+        secondary = colors['secondary'] if colors else "#a8a5e6"
+        accent = colors.get('accent', "#00cec9") if colors else "#00cec9"
+
+        # Draw hash table title
+        canvas.create_text(
+            400, 50,
+            text="Hash Table Visualization",
+            fill=primary,
+            font=("Segoe UI", 24, "bold"),
+            tags=("title",)
+        )
+        status = f"{len(self)} keys, {self.capacity} slots, load {self.load_factor():.2f}"
+        if self._old is not None:
+            status += f", resizing ({self._cursor}/{self._old.mask + 1} old slots moved)"
+        canvas.create_text(
+            400, 85,
+            text=status,
+            fill=secondary,
+            font=("Segoe UI", 11),
+            tags=("status",)
+        )
+
+        table = self._table
+        capacity = table.mask + 1
+        cell = 36
+        columns = max(1, int((width - 100) // cell))
+        rows = 12
+        group = max(1, -(-capacity // (columns * rows)))
+        cells = -(-capacity // group)
+        dist = table.dist
+        for c in range(cells):
+            first = c * group
+            longest = max(dist[first:first + group])
+            x = 50 + (c % columns) * cell
+            y = 120 + (c // columns) * (cell + 8)
+            if any(first <= i < first + group for i in highlight):
+                fill = accent
+            elif longest < 0:
+                fill = "white"
+            else:
+                fill = self._distance_color(longest)
+            canvas.create_rectangle(
+                x, y, x + cell - 2, y + cell - 2,
+                fill=fill,
+                outline=secondary,
+                width=1,
+                tags=(f"bucket{c}-rect",)
+            )
+            if group == 1 and longest >= 0:
+                canvas.create_text(
+                    x + cell / 2 - 1, y + cell / 2 - 1,
+                    text=str(table.keys[first]),
+                    fill="#2d3436",
+                    font=("Segoe UI", 9),
+                    tags=(f"bucket{c}-text",)
+                )
+
+        legend = "probe distance: 0 (green) to 8+ (red)"
+        if group > 1:
+            legend += f"; each cell shows the longest of {group} slots"
+        canvas.create_text(
+            400, 130 + rows * (cell + 8),
+            text=legend,
+            fill=secondary,
+            font=("Segoe UI", 11),
+            tags=("legend",)
+        )
+
+    @staticmethod
+    def _distance_color(distance):
+        """Blend from green at distance 0 to red at distance 8 and beyond."""
+        t = min(distance, 8) / 8
+        return "#%02x%02x%02x" % (int(0x00 + t * 0xd6), int(0xb8 - t * 0x88), int(0x94 - t * 0x64))
+
+# --- Graph Implementation ---
+class CSRGraph:
+    """Graph stored in compressed sparse row (CSR) form.
+
+    The out-edges of vertex u are targets[offsets[u]:offsets[u + 1]], with
+    matching entries in weights when the graph is weighted. Three flat
+    arrays replace a dict of lists, costing 8 bytes per edge (16 with a
+    weight) instead of a boxed int in a Python list. An undirected graph
+    stores every edge in both directions. The arrays are rebuilt in
+    O(V + E) by add_edges() and remove_edges(), so edits should be batched.
+    """
+    stats = None  # Optional Instrumentation
+
+    def __init__(self, num_vertices=0, weighted=False, undirected=False):
+        self.offsets = array('q', [0]) * (num_vertices + 1)
+        self.targets = array('q')
+        self.weights = array('d') if weighted else None
+        self.undirected = undirected
+        self._layout = None
+
+    def __len__(self):
+        return self.num_vertices
+
+    @property
+    def num_vertices(self):
+        return len(self.offsets) - 1
+
+    @property
+    def num_edges(self):
+        """Number of stored arcs (twice the edge count for undirected graphs)."""
+        return len(self.targets)
+
+    @classmethod
+    def from_edges(cls, edges, num_vertices=0, weighted=False, undirected=False):
+        """Build a graph from an iterable of (u, v) or (u, v, weight) tuples."""
+        graph = cls(0, weighted, undirected)
+        graph._build(graph._arcs(edges), num_vertices)
+        return graph
+
+    @classmethod
+    def read_edge_list(cls, path, weighted=False, undirected=False):
+        """Load a text file with one "u v [weight]" edge per line ('#' starts a comment)."""
+        def edges():
+            with open(path) as f:
+                for line in f:
+                    fields = line.split("#", 1)[0].split()
+                    if fields:
+                        yield (int(fields[0]), int(fields[1]),
+                               float(fields[2]) if len(fields) > 2 else 1.0)
+        return cls.from_edges(edges(), weighted=weighted, undirected=undirected)
+
+    @staticmethod
+    def random_edges(num_vertices, num_edges, rng=random, max_weight=9):
+        """Yield a random spanning tree over num_vertices plus extra random edges up to num_edges."""
+        for v in range(1, num_vertices):
+            yield (v, rng.randrange(v), rng.randint(1, max_weight))
+        for _ in range(max(0, num_edges - num_vertices + 1)):
+            yield (rng.randrange(num_vertices), rng.randrange(num_vertices), rng.randint(1, max_weight))
+
+    def copy(self):
+        """Return a copy of the graph."""
+        graph = CSRGraph(0, self.weights is not None, self.undirected)
+        graph.offsets = array('q', self.offsets)
+        graph.targets = array('q', self.targets)
+        if self.weights is not None:
+            graph.weights = array('d', self.weights)
+        graph._layout = self._layout
+        return graph
+
+    def _arcs(self, edges):
+        """Turn edges into stored arcs, mirroring them for undirected graphs."""
+        for edge in edges:
+            u, v = edge[0], edge[1]
+            weight = edge[2] if len(edge) > 2 else 1.0
+            yield u, v, weight
+            if self.undirected and u != v:
+                yield v, u, weight
+
+    def _build(self, arcs, num_vertices=0):
+        """Replace the arrays with arcs, grouped by source with a counting sort."""
+        sources, targets = array('q'), array('q')
+        weights = array('d') if self.weights is not None else None
+        for u, v, weight in arcs:
+            if u < 0 or v < 0:
+                raise ValueError("Vertex ids must not be negative")
+            sources.append(u)
+            targets.append(v)
+            if weights is not None:
+                weights.append(weight)
+        n = max(num_vertices, max(sources) + 1 if sources else 0, max(targets) + 1 if targets else 0)
+
+        offsets = array('q', [0]) * (n + 1)
+        for u in sources:
+            offsets[u + 1] += 1
+        for u in range(n):
+            offsets[u + 1] += offsets[u]
+        fill = offsets[:-1]
+        self.targets = array('q', [0]) * len(sources)
+        if weights is not None:
+            self.weights = array('d', [0.0]) * len(sources)
+        for i, u in enumerate(sources):
+            j = fill[u]
+            fill[u] = j + 1
+            self.targets[j] = targets[i]
+            if weights is not None:
+                self.weights[j] = weights[i]
+        self.offsets = offsets
+        self._layout = None
+        if self.stats is not None:
+            self.stats.count(structural=len(sources))
+
+    def edges(self):
+        """Yield every stored arc as (u, v, weight)."""
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        for u in range(self.num_vertices):
+            for i in range(offsets[u], offsets[u + 1]):
+                yield u, targets[i], weights[i] if weights is not None else 1.0
+
+    def add_edges(self, edges, num_vertices=0):
+        """Add a batch of (u, v) or (u, v, weight) edges, growing the vertex set as needed."""
+        new = list(self._arcs(edges))
+        self._build(chain(self.edges(), new), max(num_vertices, self.num_vertices))
+
+    def add_edge(self, u, v, weight=1.0):
+        """Add one edge. This rebuilds the arrays; prefer add_edges for batches."""
+        self.add_edges([(u, v, weight)])
+
+    def remove_edges(self, edges):
+        """Remove every arc matching one of the (u, v) pairs. Returns the arcs removed."""
+        doomed = set()
+        for u, v in edges:
+            doomed.add((u, v))
+            if self.undirected:
+                doomed.add((v, u))
+        before = self.num_edges
+        self._build(
+            (arc for arc in self.edges() if (arc[0], arc[1]) not in doomed),
+            self.num_vertices
+        )
+        return before - self.num_edges
+
+    def remove_edge(self, u, v):
+        """Remove the edge u -> v (both directions when undirected)."""
+        return self.remove_edges([(u, v)]) > 0
+
+    def random_edge(self, rng=random):
+        """Return a random stored arc as (u, v), or None if there are no edges."""
+        if not self.targets:
+            return None
+        i = rng.randrange(len(self.targets))
+        return bisect_right(self.offsets, i) - 1, self.targets[i]
+
+    def add_edge_steps(self, u, v, weight=1.0):
+        """Add an edge, then yield steps highlighting its endpoints."""
+        self.add_edge(u, v, weight)
+        yield ("add", u)
+        yield ("add", v)
+        yield ("done", None)
+
+    def remove_edge_steps(self, u, v):
+        """Yield steps highlighting an edge's endpoints, then remove it."""
+        yield ("remove", u)
+        yield ("remove", v)
+        self.remove_edge(u, v)
+        yield ("done", None)
+
+    def neighbors(self, u):
+        """Return the targets of u's out-edges."""
+        return self.targets[self.offsets[u]:self.offsets[u + 1]]
+
+    def degree(self, u):
+        """Return the number of out-edges of u."""
+        return self.offsets[u + 1] - self.offsets[u]
+
+    def bfs(self, source):
+        """Yield the vertices reachable from source in breadth-first order."""
+        offsets, targets = self.offsets, self.targets
+        seen = bytearray(self.num_vertices)
+        seen[source] = 1
+        frontier = deque([source])
+        while frontier:
+            u = frontier.popleft()
+            yield u
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                if not seen[v]:
+                    seen[v] = 1
+                    frontier.append(v)
+            if self.stats is not None:
+                self.stats.count(visits=1, comparisons=offsets[u + 1] - offsets[u])
+
+    def dfs(self, source):
+        """Yield the vertices reachable from source in depth-first preorder."""
+        offsets, targets = self.offsets, self.targets
+        seen = bytearray(self.num_vertices)
+        seen[source] = 1
+        yield source
+        # Each stack entry is a vertex and the index of its next edge to try
+        stack = [(source, offsets[source])]
+        while stack:
+            u, i = stack[-1]
+            if i == offsets[u + 1]:
+                stack.pop()
+                continue
+            stack[-1] = (u, i + 1)
+            v = targets[i]
+            if self.stats is not None:
+                self.stats.count(comparisons=1)
+            if not seen[v]:
+                seen[v] = 1
+                yield v
+                stack.append((v, offsets[v]))
+
+    def dijkstra(self, source, target=None):
+        """Return (dist, parent) lists of shortest paths from source.
+
+        Uses a binary heap with lazy deletion, so it runs in O((V + E) log V).
+        Weights must be non-negative; unweighted edges count as 1. If target
+        is given the search stops once its distance is final.
+        """
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        n = self.num_vertices
+        dist = [math.inf] * n
+        parent = [-1] * n
+        done = bytearray(n)
+        dist[source] = 0.0
+        heap = [(0.0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if done[u]:
+                continue
+            done[u] = 1
+            if u == target:
+                break
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                nd = d + (weights[i] if weights is not None else 1.0)
+                if nd < dist[v]:
+                    dist[v] = nd
+                    parent[v] = u
+                    heapq.heappush(heap, (nd, v))
+            if self.stats is not None:
+                self.stats.count(visits=1, comparisons=offsets[u + 1] - offsets[u])
+        return dist, parent
+
+    def shortest_path(self, source, target):
+        """Return (distance, [source, ..., target]), or (inf, []) if target is unreachable."""
+        dist, parent = self.dijkstra(source, target)
+        if dist[target] == math.inf:
+            return math.inf, []
+        path = [target]
+        while path[-1] != source:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return dist[target], path
+
+    def layout(self, max_row=64):
+        """Compute (or reuse) world positions for every vertex and return (xs, ys).
+
+        Vertices are layered by breadth-first depth from the lowest unplaced
+        vertex of each component and kept in discovery order within a layer,
+        so edges mostly run between neighbouring layers. Layers wider than
+        max_row wrap onto extra rows. This is O(V + E) with no iterative
+        force simulation, so it stays fast for thousands of vertices.
+        """
+        if self._layout is not None:
+            return self._layout
+        offsets, targets = self.offsets, self.targets
+        n = self.num_vertices
+        depth = array('q', [-1]) * n
+        layers = []
+        for start in range(n):
+            if depth[start] != -1:
+                continue
+            depth[start] = 0
+            frontier = deque([start])
+            while frontier:
+                u = frontier.popleft()
+                d = depth[u]
+                if d == len(layers):
+                    layers.append([])
+                layers[d].append(u)
+                for i in range(offsets[u], offsets[u + 1]):
+                    v = targets[i]
+                    if depth[v] == -1:
+                        depth[v] = d + 1
+                        frontier.append(v)
+
+        xs = array('d', [0.0]) * n
+        ys = array('d', [0.0]) * n
+        vertex_gap, row_gap, layer_gap = 40, 30, 70
+        y = 0.0
+        for layer in layers:
+            for start in range(0, len(layer), max_row):
+                row = layer[start:start + max_row]
+                left = -(len(row) - 1) * vertex_gap / 2
+                for k, u in enumerate(row):
+                    xs[u] = left + k * vertex_gap
+                    ys[u] = y
+                y += row_gap
+            y += layer_gap - row_gap
+        if self.stats is not None:
+            self.stats.count(layout_nodes=n)
+        self._layout = (xs, ys)
+        return self._layout
+
+    def draw(self, canvas, x=400, y=110, colors=None, viewport=None, highlight=(), max_edges=5000):
+        """Draw the graph at its layered layout, filling vertices in highlight with the accent color.
+
+        With a viewport only vertices inside the visible area and edges
+        touching them are drawn, and labels are dropped when zoomed out.
+        At most max_edges edges are drawn per frame.
+        """
+        primary = colors['primary'] if colors else "#6c5ce7"
+        secondary = colors['secondary'] if colors else "#a8a5e6"
+        accent = colors.get('accent', "#00cec9") if colors else "#00cec9"
+
+        # Draw graph title
+        canvas.create_text(
+            400, 50,
+            text=f"Graph Visualization ({self.num_vertices} vertices)",
+            fill=primary,
+            font=("Segoe UI", 24, "bold"),
+            tags=("title",)
+        )
+        n = self.num_vertices
+        if not n:
+            return
+
+        view = viewport or Viewport()
+        scale = view.scale
+        radius = 12 * scale
+        detailed = scale >= 0.5
+        xs, ys = self.layout()
+        screen_x = array('d', [0.0]) * n
+        screen_y = array('d', [0.0]) * n
+        shown = bytearray(n)
+        for u in range(n):
+            sx, sy = view.to_screen(x + xs[u], y + ys[u])
+            screen_x[u] = sx
+            screen_y[u] = sy
+            shown[u] = view.visible(sx - radius, sy - radius, sx + radius, sy + radius)
+
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        drawn = hidden = 0
+        for u in range(n):
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                if (self.undirected and v <= u) or not (shown[u] or shown[v]):
+                    continue
+                if drawn == max_edges:
+                    hidden += 1
+                    continue
+                drawn += 1
+                canvas.create_line(
+                    screen_x[u], screen_y[u], screen_x[v], screen_y[v],
+                    fill=secondary,
+                    width=max(1, 2 * scale),
+                    tags=(f"gedge{i}-line",)
+                )
+                if detailed and weights is not None:
+                    canvas.create_text(
+                        (screen_x[u] + screen_x[v]) / 2, (screen_y[u] + screen_y[v]) / 2,
+                        text=f"{weights[i]:g}",
+                        fill=primary,
+                        font=("Segoe UI", 8),
+                        tags=(f"gedge{i}-weight",)
+                    )
+
+        for u in range(n):
+            if not shown[u]:
+                continue
+            sx, sy = screen_x[u], screen_y[u]
+            canvas.create_oval(
+                sx - radius, sy - radius, sx + radius, sy + radius,
+                fill=accent if u in highlight else primary,
+                outline=secondary,
+                width=1,
+                tags=(f"gvert{u}-circle",)
+            )
+            if detailed:
+                canvas.create_text(
+                    sx, sy,
+                    text=str(u),
+                    fill="white",
+                    font=("Segoe UI", 8, "bold"),
+                    tags=(f"gvert{u}-text",)
+                )
+
+        if hidden:
+            canvas.create_text(
+                400, 85,
+                text=f"{hidden} more edges not drawn; zoom in to see them",
+                fill=secondary,
+                font=("Segoe UI", 11),
+                tags=("hidden",)
+            )
+
+# --- SVG Export ---
+class SVGCanvas:
+    """Drawing backend that streams canvas calls to an SVG file.
+
+    It offers the create_oval/create_text/create_line/create_polygon/
+    create_rectangle surface used by the draw methods, writing each item
+    straight to the file, so scenes of any size render without a display
+    and without being held in memory. Use it as a context manager or call
+    close() to finish the document.
+    """
+    def __init__(self, path, width=900, height=700, background="white"):
+        self.file = open(path, "w", encoding="utf-8")
+        self._next_id = 1
+        self.file.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}">\n'
+            f'<rect width="100%" height="100%" fill="{background}"/>\n'
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Write the closing tag and close the file."""
+        if not self.file.closed:
+            self.file.write("</svg>\n")
+            self.file.close()
+
+    def _coords(self, args):
+        """Flatten Tk-style coordinate arguments into a tuple of numbers."""
+        return tuple(args[0]) if len(args) == 1 and isinstance(args[0], (list, tuple)) else args
+
+    def _paint(self, options, fill_default="none"):
+        """Translate Tk fill/outline/width options into SVG attributes."""
+        fill = options.get("fill", fill_default) or "none"
+        stroke = options.get("outline", "black") or "none"
+        width = options.get("width", 1)
+        return f'fill="{fill}" stroke="{stroke}" stroke-width="{width}"'
+
+    def _emit(self, element):
+        """Write one element and return its item ID."""
+        self.file.write(element + "\n")
+        item_id = self._next_id
+        self._next_id += 1
+        return item_id
+
+    def create_oval(self, *args, **options):
+        x1, y1, x2, y2 = self._coords(args)
+        return self._emit(
+            f'<ellipse cx="{(x1 + x2) / 2:g}" cy="{(y1 + y2) / 2:g}" '
+            f'rx="{abs(x2 - x1) / 2:g}" ry="{abs(y2 - y1) / 2:g}" {self._paint(options)}/>'
+        )
+
+    def create_rectangle(self, *args, **options):
+        x1, y1, x2, y2 = self._coords(args)
+        return self._emit(
+            f'<rect x="{min(x1, x2):g}" y="{min(y1, y2):g}" '
+            f'width="{abs(x2 - x1):g}" height="{abs(y2 - y1):g}" {self._paint(options)}/>'
+        )
+
+    def create_polygon(self, *args, **options):
+        points = self._coords(args)
+        pairs = " ".join(f"{x:g},{y:g}" for x, y in zip(points[::2], points[1::2]))
+        # Tk polygons default to a black fill and no outline
+        options.setdefault("outline", "")
+        return self._emit(f'<polygon points="{pairs}" {self._paint(options, "black")}/>')
+
+    def create_line(self, *args, **options):
+        points = self._coords(args)
+        pairs = " ".join(f"{x:g},{y:g}" for x, y in zip(points[::2], points[1::2]))
+        color = options.get("fill", "black") or "none"
+        return self._emit(
+            f'<polyline points="{pairs}" fill="none" stroke="{color}" '
+            f'stroke-width="{options.get("width", 1)}"/>'
+        )
+
+    def create_text(self, *args, **options):
+        x, y = self._coords(args)
+        family, size, *style = options.get("font", ("Segoe UI", 12))
+        weight = "bold" if "bold" in style else "normal"
+        return self._emit(
+            f'<text x="{x:g}" y="{y:g}" fill="{options.get("fill", "black")}" '
+            f'font-family="{family}" font-size="{size}pt" font-weight="{weight}" '
+            f'text-anchor="middle" dominant-baseline="central">'
+            f'{xml_escape(str(options.get("text", "")))}</text>'
+        )
+
+def export_svg(structure, path, colors=None):
+    """Render a BST, Stack or Queue to an SVG file without a display."""
+    if isinstance(structure, BST):
+        # Size the document to the whole tidy layout instead of the window
+        root_layout = structure.layout()
+        span = root_layout[5] - root_layout[4] if root_layout else 0
+        depth = root_layout[3] if root_layout else 0
+        width = max(900, span * 60 + 120)
+        height = max(700, depth * 70 + 160)
+        # draw() anchors the root at x, so shift it to centre the layout's extent
+        x = width / 2 - ((root_layout[4] + root_layout[5]) / 2 * 60 if root_layout else 0)
+        with SVGCanvas(path, width, height) as canvas:
+            structure.draw(canvas, x=x, colors=colors)
+    else:
+        width = max(900, len(structure) * 75 + 200)
+        with SVGCanvas(path, width, 700) as canvas:
+            structure.draw(canvas, colors=colors)
+
+# --- Operation Logs ---
+# Binary log: an 8-byte header followed by fixed-size records of
+# (structure code, operation code, signed 64-bit value), little-endian.
+OPLOG_MAGIC = b"DSAOPS1\n"
+OPLOG_RECORD = struct.Struct("<BBq")
+OPLOG_STRUCTURES = ["BST", "AVL Tree", "Stack", "Queue", "Binary Heap", "Hash Table", "B-Tree", "Persistent BST"]
+OPLOG_OPERATIONS = ["insert", "delete", "push", "pop", "enqueue", "dequeue"]
+OPLOG_NO_VALUE = {"pop", "dequeue"}
+
+class OperationRecorder:
+    """Append structure operations to a binary operation log."""
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.file.write(OPLOG_MAGIC)
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def record(self, structure, operation, value=0):
+        """Record one operation, e.g. record("BST", "insert", 42)."""
+        self.file.write(OPLOG_RECORD.pack(
+            OPLOG_STRUCTURES.index(structure),
+            OPLOG_OPERATIONS.index(operation),
+            value or 0
+        ))
+        self.count += 1
+
+    def close(self):
+        """Flush and close the log file."""
+        self.file.close()
+
+def generate_operation_log(path, count, structure="BST", seed=0, max_value=100):
+    """Write a seeded random log of count operations on one structure."""
+    rng = random.Random(seed)
+    add, remove = {
+        "BST": ("insert", "delete"),
+        "AVL Tree": ("insert", "delete"),
+        "Stack": ("push", "pop"),
+        "Queue": ("enqueue", "dequeue"),
+        "Binary Heap": ("push", "pop"),
+        "Hash Table": ("insert", "delete"),
+        "B-Tree": ("insert", "delete"),
+        "Persistent BST": ("insert", "delete"),
+    }[structure]
+    with OperationRecorder(path) as recorder:
+        for _ in range(count):
+            if rng.random() < 0.6:
+                recorder.record(structure, add, rng.randint(1, max_value))
+            else:
+                value = rng.randint(1, max_value) if remove == "delete" else 0
+                recorder.record(structure, remove, value)
+
+def replay_operation_log(path, structures, render=None, render_every=0, chunk_records=65536,
+                         progress=None):
+    """Apply every operation in a log to the given structures.
+
+    structures maps the names in OPLOG_STRUCTURES to instances; operations
+    on structures that are missing are skipped. The file is memory-mapped
+    and decoded chunk by chunk, so logs larger than memory replay at full
+    speed. If render_every is set, render() is called after every Nth
+    operation and once at the end. progress(done, total), if given, is
+    called with record counts after each chunk. Returns the number of
+    operations applied.
+    """
+    # Resolve each (structure, operation) pair to a bound method up front
+    handlers = {}
+    for s_code, name in enumerate(OPLOG_STRUCTURES):
+        if name in structures:
+            for o_code, operation in enumerate(OPLOG_OPERATIONS):
+                method = getattr(structures[name], operation, None)
+                if method is not None:
+                    handlers[s_code, o_code] = (method, operation in OPLOG_NO_VALUE)
+
+    applied = 0
+    with open(path, "rb") as f:
+        if f.read(len(OPLOG_MAGIC)) != OPLOG_MAGIC:
+            raise ValueError(f"{path} is not an operation log")
+        size = os.fstat(f.fileno()).st_size
+        if size == len(OPLOG_MAGIC):
+            return 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            chunk_bytes = chunk_records * OPLOG_RECORD.size
+            total = (size - len(OPLOG_MAGIC)) // OPLOG_RECORD.size
+            end = len(OPLOG_MAGIC) + total * OPLOG_RECORD.size
+            for start in range(len(OPLOG_MAGIC), end, chunk_bytes):
+                if progress:
+                    progress((start - len(OPLOG_MAGIC)) // OPLOG_RECORD.size, total)
+                chunk = data[start:min(start + chunk_bytes, end)]
+                for s_code, o_code, value in OPLOG_RECORD.iter_unpack(chunk):
+                    handler = handlers.get((s_code, o_code))
+                    if handler is None:
+                        continue
+                    method, no_value = handler
+                    if no_value:
+                        method()
+                    else:
+                        method(value)
+                    applied += 1
+                    if render_every and applied % render_every == 0:
+                        render()
+    if render_every and applied % render_every:
+        render()
+    return applied
+
+# --- Snapshots ---
+# Binary snapshot: a header of (magic, structure code, section count),
+# then each section as (array typecode, item count) followed by the raw
+# little-endian items, padded to 8 bytes. Loading memory-maps the file and
+# copies every section straight into an array, with no per-item parsing.
+SNAPSHOT_MAGIC = b"DSASNP1\n"
+SNAPSHOT_HEADER = struct.Struct("<8sBB6x")
+SNAPSHOT_SECTION = struct.Struct("<c7xQ")
+SNAPSHOT_STRUCTURES = ["BST", "AVL Tree", "Stack", "Queue", "Binary Heap", "Hash Table", "B-Tree",
+                       "Graph", "Persistent BST"]
+SNAPSHOT_TYPES = [BST, AVLTree, Stack, Queue, BinaryHeap, HashTable, BTree, CSRGraph, PersistentBST]
+
+def _value_array(values):
+    """Pack values into an int64 array, or a float64 array if any is not an int."""
+    try:
+        return array('q', values)
+    except OverflowError:
+        raise ValueError("Snapshots can only store ints that fit in 64 bits") from None
+    except TypeError:
+        pass
+    try:
+        return array('d', values)
+    except (TypeError, OverflowError):
+        raise ValueError("Snapshots can only store int and float values") from None
+
+def _tree_sections(root, multiset=False):
+    """Return the pre-order keys of a tree and a byte per node flagging its children.
+
+    Multiset trees get a third section with each node's count.
+    """
+    keys = []
+    shape = bytearray()
+    counts = array('q')
+    stack = [root] if root is not None else []
+    while stack:
+        node = stack.pop()
+        keys.append(node.value)
+        counts.append(node.count)
+        shape.append((node.left is not None) | (node.right is not None) << 1)
+        if node.right is not None:
+            stack.append(node.right)
+        if node.left is not None:
+            stack.append(node.left)
+    sections = [_value_array(keys), array('B', shape)]
+    return sections + [counts] if multiset else sections
+
+def _tree_from_sections(keys, shape, counts=None):
+    """Rebuild a tree from its pre-order keys and shape in O(n) without comparing keys."""
+    if len(keys) != len(shape) or (counts is not None and len(counts) != len(keys)):
+        raise ValueError("Corrupt snapshot: keys and shape differ in length")
+    nodes = []
+    # Each entry is a node and the flags of the children it is still waiting for
+    pending = []
+    for i, (value, flags) in enumerate(zip(keys, shape)):
+        node = Node(value)
+        if counts is not None:
+            node.count = counts[i]
+        if pending:
+            parent = pending[-1]
+            if parent[1] & 1:
+                parent[0].left = node
+                parent[1] &= 2
+            else:
+                parent[0].right = node
+                parent[1] = 0
+            if not parent[1]:
+                pending.pop()
+        elif nodes:
+            raise ValueError("Corrupt snapshot: more than one root")
+        if flags:
+            pending.append([node, flags])
+        nodes.append(node)
+    if pending:
+        raise ValueError("Corrupt snapshot: missing children")
+    # Reverse pre-order reaches every child before its parent
+    for node in reversed(nodes):
+        left, right = node.left, node.right
+        node.size = node.count + (left.size if left else 0) + (right.size if right else 0)
+        node.height = 1 + max(left.height if left else 0, right.height if right else 0)
+    return nodes[0] if nodes else None
+
+def _btree_sections(root):
+    """Return a word per node in pre-order (key count * 2, plus 1 for leaves) and all keys."""
+    shape = array('q')
+    keys = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        shape.append(len(node.keys) << 1 | (not node.children))
+        keys.extend(node.keys)
+        stack.extend(reversed(node.children))
+    return [shape, _value_array(keys)]
+
+def _btree_from_sections(shape, keys):
+    """Rebuild B-tree nodes from their pre-order shape and keys without comparing keys."""
+    root = None
+    # Each entry is an internal node and how many children it is still waiting for
+    pending = []
+    start = 0
+    for word in shape:
+        count = word >> 1
+        node = BTreeNode(keys[start:start + count].tolist())
+        start += count
+        if pending:
+            parent = pending[-1]
+            parent[0].children.append(node)
+            parent[1] -= 1
+            if not parent[1]:
+                pending.pop()
+        elif root is not None:
+            raise ValueError("Corrupt snapshot: more than one root")
+        else:
+            root = node
+        if not word & 1:
+            pending.append([node, count + 1])
+    if pending or start != len(keys):
+        raise ValueError("Corrupt snapshot: B-tree shape does not match its keys")
+    return root, start
+
+def save_structure(structure, path):
+    """Write a structure to a binary snapshot file and return the bytes written."""
+    kind = type(structure)
+    if kind not in SNAPSHOT_TYPES:
+        raise ValueError(f"Cannot snapshot a {kind.__name__}")
+    if isinstance(structure, BST):
+        sections = _tree_sections(structure.root, structure.multiset)
+    elif isinstance(structure, Stack):
+        sections = [_value_array(structure.items)]
+    elif isinstance(structure, BinaryHeap):
+        sections = [_value_array(structure.items)]
+    elif isinstance(structure, Queue):
+        sections = [_value_array(list(structure))]
+    elif isinstance(structure, HashTable):
+        # int and float hashes are the same in every process, so slots are stored as they are
+        sections = [array('d', [structure.max_load, structure.migrate_step, structure._cursor])]
+        for table in (structure._table, structure._old):
+            if table is not None:
+                sections.append(_value_array([0 if d < 0 else key for key, d in zip(table.keys, table.dist)]))
+                sections.append(table.dist)
+    elif isinstance(structure, BTree):
+        sections = [array('q', [structure.t])] + _btree_sections(structure.root)
+    else:
+        sections = [
+            array('q', [structure.undirected, structure.weights is not None]),
+            structure.offsets,
+            structure.targets,
+        ]
+        if structure.weights is not None:
+            sections.append(structure.weights)
+
+    with open(path, "wb") as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_TYPES.index(kind), len(sections)))
+        for section in sections:
+            if sys.byteorder != "little":
+                section = array(section.typecode, section)
+                section.byteswap()
+            data = section.tobytes()
+            f.write(SNAPSHOT_SECTION.pack(section.typecode.encode(), len(section)))
+            f.write(data)
+            f.write(bytes(-len(data) % 8))
+        return f.tell()
+
+def read_snapshot_name(path):
+    """Return the structure name stored in a snapshot file's header."""
+    with open(path, "rb") as f:
+        header = f.read(SNAPSHOT_HEADER.size)
+    if len(header) != SNAPSHOT_HEADER.size or header[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} is not a structure snapshot")
+    code = SNAPSHOT_HEADER.unpack(header)[1]
+    if code >= len(SNAPSHOT_STRUCTURES):
+        raise ValueError(f"{path} holds an unknown structure")
+    return SNAPSHOT_STRUCTURES[code]
+
+def load_structure(path):
+    """Load a snapshot file and return (structure name, structure)."""
+    name = read_snapshot_name(path)
+    sections = []
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            _, _, count = SNAPSHOT_HEADER.unpack_from(data)
+            offset = SNAPSHOT_HEADER.size
+            with memoryview(data) as view:
+                for _ in range(count):
+                    typecode, length = SNAPSHOT_SECTION.unpack_from(data, offset)
+                    offset += SNAPSHOT_SECTION.size
+                    section = array(typecode.decode())
+                    end = offset + length * section.itemsize
+                    if end > len(data):
+                        raise ValueError(f"{path} is truncated")
+                    section.frombytes(view[offset:end])
+                    if sys.byteorder != "little":
+                        section.byteswap()
+                    sections.append(section)
+                    offset = end + (-end % 8)
+
+    kind = SNAPSHOT_TYPES[SNAPSHOT_STRUCTURES.index(name)]
+    if kind in (BST, AVLTree, PersistentBST):
+        structure = kind(multiset=len(sections) > 2)
+        structure.root = _tree_from_sections(*sections)
+        if kind is PersistentBST:
+            structure.versions = [structure.root]
+    elif kind is Stack:
+        structure = Stack()
+        structure.items = sections[0].tolist()
+    elif kind is Queue:
+        structure = Queue()
+        structure.enqueue_many(sections[0].tolist())
+    elif kind is BinaryHeap:
+        structure = BinaryHeap()
+        structure.items = sections[0].tolist()
+    elif kind is HashTable:
+        max_load, migrate_step, cursor = sections[0]
+        tables = []
+        for keys, dist in zip(sections[1::2], sections[2::2]):
+            table = _ProbeTable(len(keys))
+            table.keys = [key if d >= 0 else None for key, d in zip(keys.tolist(), dist)]
+            table.dist = dist
+            table.count = len(dist) - dist.count(-1)
+            tables.append(table)
+        structure = HashTable(len(tables[0].keys), max_load, int(migrate_step))
+        structure._table = tables[0]
+        structure._old = tables[1] if len(tables) > 1 else None
+        structure._cursor = int(cursor)
+    elif kind is BTree:
+        structure = BTree(sections[0][0])
+        structure.root, structure.size = _btree_from_sections(sections[1], sections[2])
+    else:
+        undirected, weighted = sections[0]
+        structure = CSRGraph(0, bool(weighted), bool(undirected))
+        structure.offsets, structure.targets = sections[1], sections[2]
+        if weighted:
+            structure.weights = sections[3]
+    return name, structure
+
+# --- Viewport ---
+class Viewport:
+    """Pan/zoom transform and visible area used when drawing large trees.
+
+    Screen coordinates are world coordinates times scale plus the pan
+    offset. Without a width and height the viewport is unbounded, so
+    nothing is culled.
+    """
+    def __init__(self, width=None, height=None, summary_width=24):
+        self.width = width
+        self.height = height
+        self.summary_width = summary_width  # Subtrees narrower than this collapse
+        self.reset()
+
+    def reset(self):
+        """Go back to 100% zoom with no panning."""
+        self.scale = 1.0
+        self.pan_x = 0.0
+        self.pan_y = 0.0
+
+    def to_screen(self, x, y):
+        """Map a world point to screen coordinates."""
+        return x * self.scale + self.pan_x, y * self.scale + self.pan_y
+
+    def visible(self, x1, y1, x2, y2):
+        """Check whether a screen rectangle intersects the visible area."""
+        if self.width is None or self.height is None:
+            return True
+        return x2 >= 0 and y2 >= 0 and x1 <= self.width and y1 <= self.height
+
+    def pan(self, dx, dy):
+        """Shift the view by a screen-space offset."""
+        self.pan_x += dx
+        self.pan_y += dy
+
+    def zoom(self, factor, x, y):
+        """Zoom by factor while keeping the screen point (x, y) fixed."""
+        factor = min(max(self.scale * factor, 0.02), 4.0) / self.scale
+        self.scale *= factor
+        self.pan_x = x - (x - self.pan_x) * factor
+        self.pan_y = y - (y - self.pan_y) * factor
+
+# --- Retained-Mode Rendering ---
+class RetainedCanvas:
+    """Canvas wrapper that keeps item IDs between frames.
+
+    Draw methods call the usual create_* methods with a unique key as their
+    first tag. Between begin_frame() and end_frame() an item whose key was
+    drawn before is only moved or reconfigured if its coordinates or options
+    changed, new keys create items and keys not drawn again are deleted.
+    """
+    stats = None  # Optional Instrumentation
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.items = {}  # key -> (item_id, kind, coords, options)
+        self._seen = set()
+        self._untagged = 0
+
+    def begin_frame(self):
+        """Start collecting the items of a new frame."""
+        self._seen = set()
+        self._untagged = 0
+
+    def end_frame(self):
+        """Delete the items that were not drawn in this frame."""
+        stale = [key for key in self.items if key not in self._seen]
+        for key in stale:
+            self.canvas.delete(self.items.pop(key)[0])
+        if self.stats is not None:
+            self.stats.count(canvas_deleted=len(stale))
+
+    def clear(self):
+        """Delete every item on the canvas and forget the retained ones."""
+        if self.stats is not None:
+            self.stats.count(canvas_deleted=len(self.items))
+        self.canvas.delete("all")
+        self.items.clear()
+
+    def item_id(self, key):
+        """Return the canvas item ID drawn under key, or None."""
+        entry = self.items.get(key)
+        return entry[0] if entry else None
 
-    def enqueue(self, item):
-        """Add an item to the queue."""
-        self.items.append(item)
+    def _draw(self, kind, args, options):
+        """Create or update one item, returning its canvas ID."""
+        coords = tuple(args[0]) if len(args) == 1 and isinstance(args[0], (list, tuple)) else args
+        tags = options.get("tags")
+        if tags:
+            key = tags[0]
+        else:
+            key = ("untagged", self._untagged)
+            self._untagged += 1
+        self._seen.add(key)
 
-    def dequeue(self):
-        """Remove an item from the queue."""
-        if self.items:
-            return self.items.pop(0)
+        entry = self.items.get(key)
+        if entry is not None and entry[1] == kind:
+            item_id, _, old_coords, old_options = entry
+            if coords != old_coords or options != old_options:
+                if coords != old_coords:
+                    self.canvas.coords(item_id, *coords)
+                if options != old_options:
+                    changed = {k: v for k, v in options.items() if old_options.get(k) != v}
+                    self.canvas.itemconfig(item_id, **changed)
+                if self.stats is not None:
+                    self.stats.count(canvas_updated=1)
+        else:
+            if entry is not None:
+                self.canvas.delete(entry[0])
+                if self.stats is not None:
+                    self.stats.count(canvas_deleted=1)
+            item_id = getattr(self.canvas, "create_" + kind)(*coords, **options)
+            if self.stats is not None:
+                self.stats.count(canvas_created=1)
+        self.items[key] = (item_id, kind, coords, options)
+        return item_id
 
-    def draw(self, canvas, colors=None):
-        """Draw the queue on the canvas."""
-        bar_width = 60
-        bar_gap = 15
-        y_pos = 300
-        
-        # Draw queue base shadow
-        canvas.create_rectangle(
-            52, y_pos + 32,
-            752, y_pos + 42,
-            fill="#dfe6e9",
-            outline=""
-        )
-        
-        # Draw queue base
-        canvas.create_rectangle(
-            50, y_pos + 30,
-            750, y_pos + 40,
-            fill=colors['secondary'] if colors else "#686de0",
-            outline=colors['primary'] if colors else "#4834d4",
-            width=2
-        )
-        
-        # Draw queue title
-        canvas.create_text(
-            400, 50,
-            text="Queue Visualization",
-            fill=colors['primary'] if colors else "#4834d4",
-            font=("Segoe UI", 24, "bold")
-        )
-        
-        for i, item in enumerate(self.items):
-            # Draw shadow
-            canvas.create_rectangle(
-                102 + i * (bar_width + bar_gap),
-                y_pos - 23,
-                102 + (i + 1) * bar_width + i * bar_gap,
-                y_pos + 27,
-                fill="#dfe6e9",
-                outline=""
-            )
-            
-            # Draw queue element
-            canvas.create_rectangle(
-                100 + i * (bar_width + bar_gap),
-                y_pos - 25,
-                100 + (i + 1) * bar_width + i * bar_gap,
-                y_pos + 25,
-                fill=colors['primary'] if colors else "#4834d4",
-                outline=colors['secondary'] if colors else "#686de0",
-                width=2
-            )
-            canvas.create_text(
-                100 + (i + 0.5) * bar_width + i * bar_gap,
-                y_pos,
-                text=str(item),
-                fill="white",
-                font=("Segoe UI", 12, "bold")
-            )
+    def create_oval(self, *args, **options):
+        return self._draw("oval", args, options)
+
+    def create_text(self, *args, **options):
+        return self._draw("text", args, options)
+
+    def create_line(self, *args, **options):
+        return self._draw("line", args, options)
+
+    def create_polygon(self, *args, **options):
+        return self._draw("polygon", args, options)
+
+    def create_rectangle(self, *args, **options):
+        return self._draw("rectangle", args, options)
+
+# --- Animation ---
+class Animator:
+    """Play step generators one frame at a time from the Tk event loop.
+
+    Each step yielded by an *_steps() generator is passed to show() and the
+    next one is requested interval milliseconds later with root.after(), so
+    the UI stays responsive. Operations started while an animation is
+    running queue up behind it, or with skip=True finish everything pending
+    instantly and start right away.
+    """
+    def __init__(self, root, show, fps=4):
+        self.root = root
+        self.show = show
+        self.interval = max(1, int(1000 / fps))
+        self.pending = deque()
+        self.current = None
+        self._job = None
+
+    @property
+    def busy(self):
+        """Whether an animation is playing or queued."""
+        return self.current is not None or bool(self.pending)
+
+    def play(self, steps, skip=False):
+        """Queue a step generator, optionally skipping what is in progress."""
+        if skip:
+            self.finish()
+        self.pending.append(steps)
+        if self._job is None:
+            self._tick()
+
+    def finish(self):
+        """Run every queued operation to completion without animating it."""
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+        if self.current is not None:
+            self.pending.appendleft(self.current)
+            self.current = None
+        while self.pending:
+            for _ in self.pending.popleft():
+                pass
+        self.show(None)
+
+    def _tick(self):
+        """Show the next step and schedule the following frame."""
+        self._job = None
+        while True:
+            if self.current is None:
+                if not self.pending:
+                    self.show(None)
+                    return
+                self.current = self.pending.popleft()
+            try:
+                step = next(self.current)
+            except StopIteration:
+                self.current = None
+                continue
+            self.show(step)
+            self._job = self.root.after(self.interval, self._tick)
+            return
+
+# --- Background Jobs ---
+class JobCancelled(Exception):
+    """Raised inside a background job once cancellation has been requested."""
+
+class BackgroundJob:
+    """Run work off the Tk thread and hand its result back on the Tk thread.
+
+    work(job) runs on a daemon thread. It should call job.report(fraction,
+    text) now and then, which also raises JobCancelled once cancel() has
+    been called. Messages travel through a thread-safe queue that the Tk
+    thread polls with root.after(), so on_progress, on_done and on_error
+    always run on the Tk thread. The worker must only touch its own copies
+    of the structures and return the finished snapshot.
+    """
+    def __init__(self, root, work, on_done, on_progress=None, on_error=None, poll_ms=50):
+        self.root = root
+        self.work = work
+        self.on_done = on_done
+        self.on_progress = on_progress
+        self.on_error = on_error
+        self.poll_ms = poll_ms
+        self.messages = queue.Queue()
+        self.cancelled = threading.Event()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.root.after(self.poll_ms, self._poll)
+
+    def report(self, fraction, text=""):
+        """Post progress from the worker thread, raising JobCancelled if cancelled."""
+        if self.cancelled.is_set():
+            raise JobCancelled()
+        self.messages.put(("progress", (fraction, text)))
+
+    def cancel(self):
+        """Ask the worker to stop at its next progress report."""
+        self.cancelled.set()
+
+    def _run(self):
+        """Worker thread body."""
+        try:
+            self.messages.put(("done", self.work(self)))
+        except JobCancelled:
+            self.messages.put(("cancelled", None))
+        except Exception as e:
+            self.messages.put(("error", e))
+
+    def _poll(self):
+        """Deliver queued messages on the Tk thread until the job finishes."""
+        while True:
+            try:
+                kind, payload = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                if self.on_progress:
+                    self.on_progress(*payload)
+                continue
+            self.running = False
+            if kind == "done":
+                self.on_done(payload)
+            elif self.on_error:
+                self.on_error(payload if kind == "error" else JobCancelled())
+            return
+        self.root.after(self.poll_ms, self._poll)
+
+# --- Render Scheduling ---
+class RenderScheduler:
+    """Coalesce render requests into at most one redraw per frame.
+
+    request() only marks the view dirty; the redraw runs from the Tk idle
+    queue, or later if the previous frame was less than 1 / max_fps seconds
+    ago. Requests arriving while a redraw is pending are counted as skipped.
+    """
+    stats = None  # Optional Instrumentation
+
+    def __init__(self, root, render, max_fps=60):
+        self.root = root
+        self.render = render
+        self.max_fps = max_fps
+        self._pending = None
+        self._last_render = 0.0
+
+    def request(self):
+        """Mark the view dirty and schedule a redraw if none is pending."""
+        if self._pending is not None:
+            if self.stats is not None:
+                self.stats.count(frames_skipped=1)
+            return
+        wait = self._last_render + 1.0 / self.max_fps - time.perf_counter()
+        if wait > 0:
+            self._pending = self.root.after(max(1, int(wait * 1000)), self._run)
+        else:
+            self._pending = self.root.after_idle(self._run)
+
+    def flush(self):
+        """Run a pending redraw immediately."""
+        if self._pending is not None:
+            self.root.after_cancel(self._pending)
+            self._run()
+
+    def _run(self):
+        """Perform the scheduled redraw."""
+        self._pending = None
+        self._last_render = time.perf_counter()
+        self.render()
 
 # --- Main Visualization Application ---
 class DataStructureVisualizer:
-    def __init__(self, root):
+    def __init__(self, root, max_fps=60, seed=None):
         self.root = root
         self.root.title("Modern Data Structure Visualizer")
         
@@ -347,12 +3742,38 @@ class DataStructureVisualizer:
         self.create_canvas_frame()
         self.create_control_panel()
         
+        # Coalesce redraws requested by rapid operations into single frames
+        self.scheduler = RenderScheduler(self.root, self.render_structure, max_fps)
+
         # Initialize data structures
         self.bst = BST()
+        self.avl = AVLTree()
         self.stack = Stack()
         self.queue = Queue()
+        self.heap = BinaryHeap()
+        self.hash_table = HashTable()
+        self.btree = BTree()
+        self.graph = CSRGraph(weighted=True, undirected=True)
+        self.pbst = PersistentBST()
         self.current_structure = "BST"
 
+        # Seeded source of values so sessions can be reproduced
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.recorder = None
+
+        # Step-by-step animation of operations, see apply
+        self.animator = Animator(self.root, self.show_step)
+        self.highlight = None
+        self.matches = frozenset()  # Nodes picked out by the last query, see range_query
+
+        # Background worker for large operations, see run_job
+        self.job = None
+
+        # Instrumentation is attached on demand, see toggle_instrumentation
+        self.stats = None
+        self._operation_start = None
+
     def create_canvas_frame(self):
         """Create enhanced canvas frame with shadow effect"""
         self.canvas_frame = tk.Frame(
@@ -380,6 +3801,18 @@ class DataStructureVisualizer:
             highlightthickness=0
         )
         self.canvas.pack(fill=tk.BOTH, expand=True, padx=15, pady=15)
+        self.renderer = RetainedCanvas(self.canvas)
+
+        # Pan (drag) and zoom (mouse wheel) for the tree views
+        self.viewport = Viewport(900, 700)
+        self._drag_start = None
+        self.canvas.bind("<Configure>", self.on_canvas_resize)
+        self.canvas.bind("<ButtonPress-1>", self.on_drag_start)
+        self.canvas.bind("<B1-Motion>", self.on_drag)
+        self.canvas.bind("<Double-Button-1>", self.reset_view)
+        self.canvas.bind("<MouseWheel>", self.on_zoom)
+        self.canvas.bind("<Button-4>", self.on_zoom)
+        self.canvas.bind("<Button-5>", self.on_zoom)
 
     def create_rounded_rectangle(self, canvas, x1, y1, x2, y2, radius, **kwargs):
         """Create a rounded rectangle"""
@@ -399,24 +3832,20 @@ class DataStructureVisualizer:
         ]
         return canvas.create_polygon(points, smooth=True, **kwargs)
 
-    def create_rounded_button(self, parent, text, command):
-        """Create a button with rounded corners and gradient effect"""
-        frame = tk.Frame(parent, bg="white")
-        frame.pack(pady=8)
-        
+    def create_rounded_button(self, parent, text, command, width=250):
+        """Create a button with rounded corners and gradient effect; the caller places it"""
         button = tk.Canvas(
-            frame,
-            width=250,
+            parent,
+            width=width,
             height=40,
             bg="white",
             highlightthickness=0
         )
-        button.pack()
 
         # Create gradient button with rounded corners
         self.create_rounded_rectangle(
             button,
-            0, 0, 250, 40,
+            0, 0, width, 40,
             radius=20,
             fill=self.button_gradient[0],
             outline="",
@@ -424,10 +3853,10 @@ class DataStructureVisualizer:
         )
 
         button.create_text(
-            125, 20,
+            width / 2, 20,
             text=text,
             fill="white",
-            font=("Segoe UI", 11, "bold"),
+            font=("Segoe UI", 10, "bold"),
             tags=("button_text",)
         )
 
@@ -448,14 +3877,27 @@ class DataStructureVisualizer:
 
     def create_control_panel(self):
         """Create enhanced control panel with modern styling"""
+        # The panel scrolls, so short windows never clip the status readout
+        self.panel_frame = tk.Frame(self.main_frame, bg="white")
+        self.panel_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=10)
+
+        self.panel_canvas = tk.Canvas(self.panel_frame, bg="white", width=350, highlightthickness=0)
+        scrollbar = tk.Scrollbar(self.panel_frame, orient=tk.VERTICAL, command=self.panel_canvas.yview)
+        self.panel_canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.panel_canvas.pack(side=tk.LEFT, fill=tk.Y)
+
         self.control_panel = tk.Frame(
-            self.main_frame,
+            self.panel_canvas,
             bg="white",
-            width=350,
             padx=30,
             pady=30,
         )
-        self.control_panel.pack(side=tk.RIGHT, fill=tk.BOTH, padx=10)
+        self.panel_canvas.create_window((0, 0), window=self.control_panel, anchor="nw")
+        self.control_panel.bind("<Configure>", self.on_panel_resize)
+        # The mouse wheel scrolls the panel only while the pointer is over it
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.root.bind_all(sequence, self.on_panel_scroll, add="+")
         
         # Title with enhanced styling
         title_frame = tk.Frame(self.control_panel, bg="white")
@@ -497,7 +3939,7 @@ class DataStructureVisualizer:
         
         self.structure_selector = ttk.Combobox(
             selector_frame,
-            values=["BST", "Stack", "Queue"],
+            values=["BST", "AVL Tree", "Stack", "Queue", "Binary Heap", "Hash Table", "B-Tree", "Graph", "Persistent BST"],
             font=self.font_style,
             state="readonly"
         )
@@ -505,31 +3947,92 @@ class DataStructureVisualizer:
         self.structure_selector.pack(fill=tk.X, pady=5)
         self.structure_selector.bind('<<ComboboxSelected>>', self.toggle_structure)
         
-        # Create rounded buttons
-        self.insert_button = self.create_rounded_button(
-            self.control_panel,
-            "Insert Element",
-            self.insert
-        )
-        
-        self.delete_button = self.create_rounded_button(
-            self.control_panel,
-            "Delete Element",
-            self.delete
-        )
-        
-        self.show_button = self.create_rounded_button(
-            self.control_panel,
-            "Visualize Structure",
-            self.show_structure
-        )
-        
-        self.clear_button = self.create_rounded_button(
+        # Buttons sit in two columns under short headings instead of one long stack
+        self.create_button_grid("Operations", (
+            ("insert_button", "Insert", self.insert),
+            ("batch_button", "Insert Batch", self.insert_batch),
+            ("delete_button", "Delete", self.delete),
+            ("show_button", "Visualize", self.show_structure),
+            ("range_button", "Range Query", self.range_query),
+            ("path_button", "Shortest Path", self.shortest_path),
+            ("clear_button", "Clear Canvas", self.clear_canvas),
+        ))
+        self.create_button_grid("Files and background jobs", (
+            ("record_button", "Record On/Off", self.toggle_recording),
+            ("replay_button", "Replay Log", self.replay_log),
+            ("save_button", "Save Structure", self.save_snapshot),
+            ("load_button", "Load Structure", self.load_snapshot),
+            ("bulk_button", "Bulk Load 100k", self.bulk_load),
+            ("delete_half_button", "Delete Half", self.delete_half),
+            ("cancel_button", "Cancel Job", self.cancel_job),
+        ))
+
+        # Animation options
+        options_frame = tk.Frame(self.control_panel, bg="white")
+        options_frame.pack(fill=tk.X, pady=(10, 0))
+
+        self.animate_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            options_frame,
+            text="Animate operations",
+            variable=self.animate_var,
+            bg="white",
+            fg=self.text_color,
+            font=("Segoe UI", 10)
+        ).pack(anchor="w")
+
+        self.skip_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            options_frame,
+            text="New operations skip ahead",
+            variable=self.skip_var,
+            bg="white",
+            fg=self.text_color,
+            font=("Segoe UI", 10)
+        ).pack(anchor="w")
+
+        self.multiset_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            options_frame,
+            text="Multiset trees (count duplicates)",
+            variable=self.multiset_var,
+            command=self.toggle_multiset,
+            bg="white",
+            fg=self.text_color,
+            font=("Segoe UI", 10)
+        ).pack(anchor="w")
+
+        # Version history for the persistent BST
+        history_frame = tk.Frame(self.control_panel, bg="white")
+        history_frame.pack(fill=tk.X, pady=(10, 0))
+
+        for text, command in (("Undo", self.undo), ("Redo", self.redo)):
+            tk.Button(
+                history_frame,
+                text=text,
+                command=command,
+                bg=self.button_gradient[0],
+                fg="white",
+                activebackground=self.button_hover_gradient[0],
+                relief="flat",
+                font=("Segoe UI", 10, "bold"),
+                width=10
+            ).pack(side=tk.LEFT, padx=(0, 10))
+
+        self.history_scale = tk.Scale(
             self.control_panel,
-            "Clear Canvas",
-            self.clear_canvas
+            from_=0,
+            to=0,
+            orient=tk.HORIZONTAL,
+            label="Persistent BST version",
+            command=self.goto_version,
+            bg="white",
+            fg=self.text_color,
+            highlightthickness=0,
+            font=("Segoe UI", 10)
         )
-        
+        self.history_scale.pack(fill=tk.X)
+
         # Enhanced status display
         self.status_frame = tk.Frame(self.control_panel, bg="white")
         self.status_frame.pack(fill=tk.X, pady=(20, 0))
@@ -544,6 +4047,58 @@ class DataStructureVisualizer:
         )
         self.status_label.pack()
 
+        # Opt-in instrumentation readout
+        self.instrument_var = tk.BooleanVar(value=False)
+        self.instrument_check = tk.Checkbutton(
+            self.status_frame,
+            text="Show instrumentation",
+            variable=self.instrument_var,
+            command=self.toggle_instrumentation,
+            bg="white",
+            fg=self.text_color,
+            font=("Segoe UI", 10)
+        )
+        self.instrument_check.pack(pady=(10, 0))
+
+        self.stats_label = tk.Label(
+            self.status_frame,
+            text="",
+            bg="white",
+            fg=self.text_color,
+            font=("Consolas", 9),
+            justify=tk.LEFT
+        )
+        self.stats_label.pack()
+
+    def create_button_grid(self, heading, buttons):
+        """Lay out (attribute, text, command) buttons two per row under a heading."""
+        tk.Label(
+            self.control_panel,
+            text=heading,
+            bg="white",
+            fg=self.text_color,
+            font=("Segoe UI", 12, "bold")
+        ).pack(anchor="w", pady=(10, 0))
+        grid = tk.Frame(self.control_panel, bg="white")
+        grid.pack(fill=tk.X)
+        for i, (name, text, command) in enumerate(buttons):
+            button = self.create_rounded_button(grid, text, command, width=140)
+            button.grid(row=i // 2, column=i % 2, padx=4, pady=4)
+            setattr(self, name, button)
+
+    def on_panel_resize(self, event):
+        """Fit the control panel's scroll region to its contents."""
+        self.panel_canvas.configure(scrollregion=self.panel_canvas.bbox("all"), width=event.width)
+
+    def on_panel_scroll(self, event):
+        """Scroll the control panel with the mouse wheel when the pointer is over it."""
+        widget = self.root.winfo_containing(event.x_root, event.y_root)
+        panel = str(self.panel_frame)
+        if widget is None or not (str(widget) == panel or str(widget).startswith(panel + ".")):
+            return
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        self.panel_canvas.yview_scroll(-1 if up else 1, "units")
+
     def on_hover(self, event, button):
         """Enhanced hover effect for buttons."""
         button.config(bg=self.button_hover_gradient[0])
@@ -552,77 +4107,726 @@ class DataStructureVisualizer:
         """Enhanced leave effect for buttons."""
         button.config(bg=self.button_gradient[0])
 
+    def is_tree_view(self):
+        """Check whether the current structure is drawn with the pannable view."""
+        return self.current_structure in ("BST", "AVL Tree", "Graph", "Persistent BST")
+
+    def on_canvas_resize(self, event):
+        """Keep the viewport's visible area in sync with the canvas size."""
+        self.viewport.width = event.width
+        self.viewport.height = event.height
+        if self.is_tree_view():
+            self.show_structure()
+
+    def on_drag_start(self, event):
+        """Remember where a pan drag started."""
+        self._drag_start = (event.x, event.y)
+
+    def on_drag(self, event):
+        """Pan the tree view while dragging."""
+        if self._drag_start is None or not self.is_tree_view():
+            return
+        self.viewport.pan(event.x - self._drag_start[0], event.y - self._drag_start[1])
+        self._drag_start = (event.x, event.y)
+        self.show_structure()
+
+    def on_zoom(self, event):
+        """Zoom the tree view around the mouse pointer."""
+        if not self.is_tree_view():
+            return
+        zoom_in = event.num == 4 or getattr(event, "delta", 0) > 0
+        self.viewport.zoom(1.2 if zoom_in else 1 / 1.2, event.x, event.y)
+        self.show_structure()
+
+    def reset_view(self, event=None):
+        """Reset the tree view to 100% zoom with no panning."""
+        self.viewport.reset()
+        if self.is_tree_view():
+            self.show_structure()
+
     def toggle_structure(self, event):
         """Switch between data structures."""
+        self.animator.finish()
         self.current_structure = self.structure_selector.get()
+        self.matches = frozenset()
         self.clear_canvas()
         self.status_label.config(text=f"Switched to {self.current_structure}", fg=self.text_color)
 
     def insert(self):
         """Insert a node depending on the selected structure."""
+        if self.job_running():
+            return
+        self.begin_operation()
         if self.current_structure == "BST":
-            value = random.randint(1, 100)
-            self.bst.insert(value)
+            value = self.rng.randint(1, 100)
+            self.apply(self.bst, "insert", value)
+            self.record("insert", value)
             self.status_label.config(text=f"Inserted {value} into BST", fg=self.success_color)
             self.show_structure()
+        elif self.current_structure == "AVL Tree":
+            value = self.rng.randint(1, 100)
+            self.apply(self.avl, "insert", value)
+            self.record("insert", value)
+            self.status_label.config(
+                text=f"Inserted {value} into AVL Tree (height {self.avl.height()})",
+                fg=self.success_color
+            )
+            self.show_structure()
+        elif self.current_structure == "Persistent BST":
+            value = self.rng.randint(1, 100)
+            self.apply(self.pbst, "insert", value)
+            self.record("insert", value)
+            self.status_label.config(text=f"Inserted {value} into Persistent BST", fg=self.success_color)
+            self.show_structure()
         elif self.current_structure == "Stack":
-            value = random.randint(1, 100)
-            self.stack.push(value)
+            value = self.rng.randint(1, 100)
+            self.apply(self.stack, "push", value)
+            self.record("push", value)
             self.status_label.config(text=f"Pushed {value} onto Stack", fg=self.success_color)
             self.show_structure()
         elif self.current_structure == "Queue":
-            value = random.randint(1, 100)
-            self.queue.enqueue(value)
+            value = self.rng.randint(1, 100)
+            self.apply(self.queue, "enqueue", value)
+            self.record("enqueue", value)
             self.status_label.config(text=f"Enqueued {value} into Queue", fg=self.success_color)
             self.show_structure()
+        elif self.current_structure == "Binary Heap":
+            value = self.rng.randint(1, 100)
+            self.apply(self.heap, "push", value)
+            self.record("push", value)
+            self.status_label.config(text=f"Pushed {value} onto Binary Heap", fg=self.success_color)
+            self.show_structure()
+        elif self.current_structure == "B-Tree":
+            value = self.rng.randint(1, 100)
+            inserted = self.apply(self.btree, "insert", value)
+            self.record("insert", value)
+            if inserted is None:
+                text = f"Inserting {value} into B-Tree"
+            elif inserted:
+                text = f"Inserted {value} into B-Tree (height {self.btree.height()})"
+            else:
+                text = f"{value} is already in B-Tree"
+            self.status_label.config(text=text, fg=self.success_color)
+            self.show_structure()
+        elif self.current_structure == "Graph":
+            n = self.graph.num_vertices
+            # Grow with a new vertex now and then, otherwise join two existing ones
+            if n < 2 or self.rng.random() < 0.4:
+                u, v = max(n, 1), self.rng.randrange(max(n, 1))
+            else:
+                u, v = self.rng.sample(range(n), 2)
+            weight = self.rng.randint(1, 9)
+            self.apply(self.graph, "add_edge", u, v, weight)
+            self.status_label.config(text=f"Added edge {u}-{v} (weight {weight}) to Graph", fg=self.success_color)
+            self.show_structure()
+        elif self.current_structure == "Hash Table":
+            value = self.rng.randint(1, 100)
+            inserted = self.apply(self.hash_table, "insert", value)
+            self.record("insert", value)
+            if inserted is None:
+                text = f"Inserting {value} into Hash Table"
+            elif inserted:
+                text = f"Inserted {value} into Hash Table"
+            else:
+                text = f"{value} is already in Hash Table"
+            self.status_label.config(text=text, fg=self.success_color)
+            self.show_structure()
+
+    def insert_batch(self, count=10):
+        """Insert a batch of random values and redraw once."""
+        if self.job_running():
+            return
+        self.begin_operation()
+        values = [self.rng.randint(1, 100) for _ in range(count)]
+        self.animator.finish()
+        if self.current_structure == "BST":
+            self.bst.insert_many(values)
+        elif self.current_structure == "AVL Tree":
+            self.avl.insert_many(values)
+        elif self.current_structure == "Persistent BST":
+            self.pbst.insert_many(values)
+        elif self.current_structure == "Stack":
+            self.stack.push_many(values)
+        elif self.current_structure == "Queue":
+            self.queue.enqueue_many(values)
+        elif self.current_structure == "Binary Heap":
+            self.heap.push_many(values)
+        elif self.current_structure == "Hash Table":
+            self.hash_table.insert_many(values)
+        elif self.current_structure == "B-Tree":
+            self.btree.insert_many(values)
+        elif self.current_structure == "Graph":
+            # Attach each new vertex to an earlier one, using the values as weights
+            start = max(self.graph.num_vertices, 1)
+            self.graph.add_edges(
+                (start + i, self.rng.randrange(start + i), value) for i, value in enumerate(values)
+            )
+        for value in values:
+            self.record(
+                {"Stack": "push", "Queue": "enqueue", "Binary Heap": "push"}.get(self.current_structure, "insert"),
+                value
+            )
+        self.status_label.config(
+            text=f"Inserted {count} values into {self.current_structure}",
+            fg=self.success_color
+        )
+        self.show_structure()
 
     def delete(self):
         """Delete a node depending on the selected structure."""
+        if self.job_running():
+            return
+        self.begin_operation()
         try:
             if self.current_structure == "BST":
                 if self.bst.root:
-                    value = random.choice(self.bst.inorder())
-                    self.bst.delete(value)
+                    value = self.bst.random_value(self.rng)
+                    self.apply(self.bst, "delete", value)
+                    self.record("delete", value)
                     self.status_label.config(text=f"Deleted {value} from BST", fg=self.success_color)
                 else:
                     self.status_label.config(text="BST is empty", fg=self.error_color)
+            elif self.current_structure == "AVL Tree":
+                if self.avl.root:
+                    value = self.avl.random_value(self.rng)
+                    self.apply(self.avl, "delete", value)
+                    self.record("delete", value)
+                    self.status_label.config(
+                        text=f"Deleted {value} from AVL Tree (height {self.avl.height()})",
+                        fg=self.success_color
+                    )
+                else:
+                    self.status_label.config(text="AVL Tree is empty", fg=self.error_color)
+            elif self.current_structure == "Persistent BST":
+                if self.pbst.root:
+                    value = self.pbst.random_value(self.rng)
+                    self.apply(self.pbst, "delete", value)
+                    self.record("delete", value)
+                    self.status_label.config(text=f"Deleted {value} from Persistent BST", fg=self.success_color)
+                else:
+                    self.status_label.config(text="Persistent BST is empty", fg=self.error_color)
             elif self.current_structure == "Stack":
                 if self.stack.items:
-                    value = self.stack.pop()
+                    value = self.stack.items[-1]
+                    self.apply(self.stack, "pop")
+                    self.record("pop")
                     self.status_label.config(text=f"Popped {value} from Stack", fg=self.success_color)
                 else:
                     self.status_label.config(text="Stack is empty", fg=self.error_color)
             elif self.current_structure == "Queue":
-                if self.queue.items:
-                    value = self.queue.dequeue()
+                if len(self.queue):
+                    value = self.queue.peek()
+                    self.apply(self.queue, "dequeue")
+                    self.record("dequeue")
                     self.status_label.config(text=f"Dequeued {value} from Queue", fg=self.success_color)
                 else:
                     self.status_label.config(text="Queue is empty", fg=self.error_color)
+            elif self.current_structure == "Binary Heap":
+                if len(self.heap):
+                    value = self.heap.peek()
+                    self.apply(self.heap, "pop")
+                    self.record("pop")
+                    self.status_label.config(text=f"Popped minimum {value} from Binary Heap", fg=self.success_color)
+                else:
+                    self.status_label.config(text="Binary Heap is empty", fg=self.error_color)
+            elif self.current_structure == "Hash Table":
+                if len(self.hash_table):
+                    value = self.hash_table.random_value(self.rng)
+                    self.apply(self.hash_table, "delete", value)
+                    self.record("delete", value)
+                    self.status_label.config(text=f"Deleted {value} from Hash Table", fg=self.success_color)
+                else:
+                    self.status_label.config(text="Hash Table is empty", fg=self.error_color)
+            elif self.current_structure == "B-Tree":
+                if len(self.btree):
+                    value = self.btree.random_value(self.rng)
+                    self.apply(self.btree, "delete", value)
+                    self.record("delete", value)
+                    self.status_label.config(text=f"Deleted {value} from B-Tree", fg=self.success_color)
+                else:
+                    self.status_label.config(text="B-Tree is empty", fg=self.error_color)
+            elif self.current_structure == "Graph":
+                if self.graph.num_edges:
+                    u, v = self.graph.random_edge(self.rng)
+                    self.apply(self.graph, "remove_edge", u, v)
+                    self.status_label.config(text=f"Removed edge {u}-{v} from Graph", fg=self.success_color)
+                else:
+                    self.status_label.config(text="Graph has no edges", fg=self.error_color)
             
             self.show_structure()
         except Exception as e:
             self.status_label.config(text=f"Error: {str(e)}", fg=self.error_color)
 
+    def range_query(self):
+        """Highlight the keys of the current tree that fall in a random 20-wide range."""
+        tree = {"BST": self.bst, "AVL Tree": self.avl, "Persistent BST": self.pbst}.get(self.current_structure)
+        if tree is None:
+            self.status_label.config(text="Range queries need a binary search tree", fg=self.error_color)
+            return
+        self.animator.finish()
+        self.begin_operation()
+        lo = self.rng.randint(1, 80)
+        hi = lo + 20
+        self.matches = frozenset(tree.range_nodes(lo, hi))
+        self.status_label.config(
+            text=f"{len(self.matches)} keys in [{lo}, {hi}]; "
+                 f"predecessor of {lo} is {tree.predecessor(lo)}, successor of {hi} is {tree.successor(hi)}",
+            fg=self.success_color
+        )
+        self.show_structure()
+
+    def shortest_path(self):
+        """Find the shortest path from vertex 0 to a random vertex and walk along it."""
+        if self.current_structure != "Graph":
+            self.status_label.config(text="Select Graph to find shortest paths", fg=self.error_color)
+            return
+        if self.graph.num_vertices < 2:
+            self.status_label.config(text="Graph needs at least two vertices", fg=self.error_color)
+            return
+        self.begin_operation()
+        target = self.rng.randrange(1, self.graph.num_vertices)
+        distance, path = self.graph.shortest_path(0, target)
+        if path:
+            self.status_label.config(
+                text=f"Shortest path 0 -> {target}: {len(path) - 1} edges, weight {distance:g}",
+                fg=self.success_color
+            )
+            if self.animate_var.get():
+                self.animator.play((("path", v) for v in path), skip=self.skip_var.get())
+            else:
+                self.highlight = target
+        else:
+            self.status_label.config(text=f"Vertex {target} is not reachable from 0", fg=self.error_color)
+        self.show_structure()
+
+    def undo(self):
+        """Step the persistent BST back one version."""
+        self.step_history(self.pbst.undo, "Nothing to undo")
+
+    def redo(self):
+        """Step the persistent BST forward one version."""
+        self.step_history(self.pbst.redo, "Nothing to redo")
+
+    def step_history(self, step, empty_message):
+        """Run undo or redo on the persistent BST and report the version reached."""
+        if self.current_structure != "Persistent BST":
+            self.status_label.config(text="Select Persistent BST to use its history", fg=self.error_color)
+            return
+        if self.job_running() or self.recording_refuses("move through the history"):
+            return
+        self.animator.finish()
+        if step():
+            self.status_label.config(
+                text=f"Version {self.pbst.version} of {len(self.pbst.versions) - 1}",
+                fg=self.success_color
+            )
+            self.show_structure()
+        else:
+            self.status_label.config(text=empty_message, fg=self.error_color)
+
+    def goto_version(self, value):
+        """Jump the persistent BST to the version picked on the history slider."""
+        version = int(float(value))
+        if self.current_structure != "Persistent BST" or version == self.pbst.version:
+            return
+        if self.job_running() or self.recording_refuses("move through the history"):
+            # Put the slider back on the version that is still shown
+            self.history_scale.set(self.pbst.version)
+            return
+        if version < len(self.pbst.versions):
+            self.animator.finish()
+            self.pbst.goto(version)
+            self.status_label.config(
+                text=f"Version {version} of {len(self.pbst.versions) - 1}",
+                fg=self.text_color
+            )
+            self.show_structure()
+
+    def apply(self, structure, operation, *args):
+        """Run an operation on a structure, animated when animation is enabled.
+
+        Returns the operation's result, or None if it was queued for the animator.
+        """
+        if self.animate_var.get():
+            steps = getattr(structure, operation + "_steps")(*args)
+            self.animator.play(steps, skip=self.skip_var.get())
+            return None
+        return getattr(structure, operation)(*args)
+
+    def show_step(self, step):
+        """Highlight the target of an animation step (None clears it)."""
+        self.highlight = step[1] if step is not None else None
+        self.show_structure()
+
+    def toggle_instrumentation(self):
+        """Attach or detach a shared Instrumentation to every structure and the renderer."""
+        self.stats = Instrumentation() if self.instrument_var.get() else None
+        for structure in self.structures().values():
+            structure.stats = self.stats
+        self.renderer.stats = self.stats
+        self.scheduler.stats = self.stats
+        self.stats_label.config(text=self.stats.summary() if self.stats else "")
+
+    def toggle_multiset(self):
+        """Rebuild the BSTs in the background with or without per-node duplicate counts."""
+        multiset = self.multiset_var.get()
+        if self.job_running() or self.recording_refuses("switch multiset mode"):
+            self.multiset_var.set(not multiset)
+            return
+        # Land queued animations, then give the worker copies that only it reads
+        self.animator.finish()
+        trees = {"BST": self.bst.copy(), "AVL Tree": self.avl.copy(), "Persistent BST": self.pbst.copy()}
+
+        def work(job):
+            rebuilt = {}
+            for i, (name, tree) in enumerate(trees.items()):
+                job.report(i / len(trees), f"rebuilding {name}")
+                # Sorted input rebuilds balanced; the persistent history restarts here
+                rebuilt[name] = type(tree).from_sorted(tree.inorder(), presorted=True, multiset=multiset)
+                rebuilt[name].layout()
+            mode = "count duplicates per node" if multiset else "store duplicates as separate nodes"
+            return rebuilt, f"Trees now {mode}"
+
+        self.run_job("Multiset mode", work, on_fail=lambda: self.multiset_var.set(not multiset))
+
+    def phase(self, name):
+        """Time a phase when instrumentation is on, otherwise do nothing."""
+        return self.stats.phase(name) if self.stats is not None else nullcontext()
+
+    def begin_operation(self):
+        """Start timing the mutation phase of a user operation."""
+        self.matches = frozenset()
+        if self.stats is not None:
+            self.stats.reset_last()
+            self._operation_start = time.perf_counter()
+
+    def record(self, operation, value=0):
+        """Append an operation on the current structure to the active recording."""
+        # Graph edits take two vertices, which the log format cannot hold
+        if self.recorder is not None and self.current_structure in OPLOG_STRUCTURES:
+            self.recorder.record(self.current_structure, operation, value)
+
+    def recording_refuses(self, action):
+        """Check for a running recording, reporting that action cannot be logged.
+
+        Operation logs only hold single-value edits, so a replay could not
+        reproduce the change and it is refused instead.
+        """
+        if self.recorder is not None:
+            self.status_label.config(
+                text=f"Stop recording to {action}; operation logs cannot hold it",
+                fg=self.error_color
+            )
+            return True
+        return False
+
+    def toggle_recording(self):
+        """Start recording operations to a log file, or stop the running recording."""
+        if self.recorder is not None:
+            count = self.recorder.count
+            self.recorder.close()
+            self.recorder = None
+            self.status_label.config(text=f"Recorded {count} operations", fg=self.success_color)
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=".dsalog",
+            filetypes=[("Operation logs", "*.dsalog"), ("All files", "*.*")]
+        )
+        if path:
+            self.recorder = OperationRecorder(path)
+            self.status_label.config(text=f"Recording (seed {self.seed})", fg=self.success_color)
+
+    def structures(self):
+        """Map structure names to the live instances."""
+        return {
+            "BST": self.bst,
+            "AVL Tree": self.avl,
+            "Stack": self.stack,
+            "Queue": self.queue,
+            "Binary Heap": self.heap,
+            "Hash Table": self.hash_table,
+            "B-Tree": self.btree,
+            "Graph": self.graph,
+            "Persistent BST": self.pbst,
+        }
+
+    def replay_log(self):
+        """Replay an operation log in the background into copies of the structures."""
+        if self.recording_refuses("replay another log"):
+            return
+        path = filedialog.askopenfilename(
+            filetypes=[("Operation logs", "*.dsalog"), ("All files", "*.*")]
+        )
+        if not path or self.job_running():
+            return
+        # Queued animations must land before the copies are taken
+        self.animator.finish()
+        snapshot = {name: structure.copy() for name, structure in self.structures().items()}
+
+        def work(job):
+            count = replay_operation_log(
+                path, snapshot,
+                progress=lambda done, total: job.report(done / total, f"{done}/{total} ops")
+            )
+            job.report(1.0, "laying out")
+            for name in ("BST", "AVL Tree", "Persistent BST"):
+                snapshot[name].layout()
+            return snapshot, f"Replayed {count} operations"
+
+        self.run_job("Replay", work)
+
+    def save_snapshot(self):
+        """Save the current structure to a binary snapshot file."""
+        path = filedialog.asksaveasfilename(
+            defaultextension=".dsasnap",
+            filetypes=[("Structure snapshots", "*.dsasnap"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        # Land animations and draw them now, so the view shows what is being written
+        self.animator.finish()
+        self.scheduler.flush()
+        try:
+            size = save_structure(self.structures()[self.current_structure], path)
+        except (OSError, ValueError) as e:
+            self.status_label.config(text=f"Error: {str(e)}", fg=self.error_color)
+            return
+        self.status_label.config(
+            text=f"Saved {self.current_structure} to {os.path.basename(path)} ({size} bytes)",
+            fg=self.success_color
+        )
+
+    def load_snapshot(self):
+        """Load a snapshot file in the background and switch to its structure."""
+        if self.recording_refuses("load a snapshot"):
+            return
+        path = filedialog.askopenfilename(
+            filetypes=[("Structure snapshots", "*.dsasnap"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            name = read_snapshot_name(path)
+        except (OSError, ValueError) as e:
+            self.status_label.config(text=f"Error: {str(e)}", fg=self.error_color)
+            return
+        if self.job_running():
+            return
+        self.structure_selector.set(name)
+        self.toggle_structure(None)
+
+        def work(job):
+            loaded_name, structure = load_structure(path)
+            job.report(1.0, "laying out")
+            if loaded_name in ("BST", "AVL Tree", "Persistent BST", "Graph"):
+                structure.layout()
+            return {loaded_name: structure}, f"Loaded {len(structure)} elements into {loaded_name}"
+
+        self.run_job("Load", work)
+
+    def bulk_load(self, count=100000):
+        """Insert count random values into the current structure in the background."""
+        if self.job_running() or self.recording_refuses("bulk load"):
+            return
+        self.animator.finish()
+        name = self.current_structure
+        snapshot = self.structures()[name].copy()
+        rng = random.Random(self.rng.getrandbits(64))
+
+        def work(job):
+            values = []
+            for start in range(0, count, 10000):
+                job.report(start / count, f"generated {start}/{count}")
+                values.extend(rng.randint(1, 100) for _ in range(min(10000, count - start)))
+            job.report(1.0, "building")
+            if name == "Graph":
+                # Use the values as weights of a random graph with count edges
+                weights = iter(values)
+                snapshot.add_edges(
+                    (u, v, next(weights))
+                    for u, v, _ in CSRGraph.random_edges(max(2, count // 10), count, rng)
+                )
+                snapshot.layout()
+                return {name: snapshot}, f"Loaded {count} edges into Graph"
+            if name in ("BST", "AVL Tree", "Persistent BST", "Hash Table", "B-Tree"):
+                snapshot.insert_many(values)
+            elif name in ("Stack", "Binary Heap"):
+                snapshot.push_many(values)
+            else:
+                snapshot.enqueue_many(values)
+            if name in ("BST", "AVL Tree", "Persistent BST"):
+                snapshot.layout()
+            return {name: snapshot}, f"Loaded {count} values into {name}"
+
+        self.run_job("Bulk load", work)
+
+    def delete_half(self):
+        """Delete a random half of the current structure's elements in the background."""
+        if self.job_running() or self.recording_refuses("delete half of the elements"):
+            return
+        self.animator.finish()
+        name = self.current_structure
+        snapshot = self.structures()[name].copy()
+        rng = random.Random(self.rng.getrandbits(64))
+
+        def work(job):
+            if name == "Graph":
+                edges = [(u, v) for u, v, _ in snapshot.edges() if u <= v]
+                victims = rng.sample(edges, len(edges) // 2)
+                job.report(0.5, f"removing {len(victims)} edges")
+                snapshot.remove_edges(victims)
+                snapshot.layout()
+                return {name: snapshot}, f"Deleted {len(victims)} edges from Graph"
+            count = len(snapshot) // 2
+            for i in range(count):
+                if i % 10000 == 0:
+                    job.report(i / count, f"deleted {i}/{count}")
+                if name in ("BST", "AVL Tree", "Persistent BST", "Hash Table", "B-Tree"):
+                    snapshot.delete(snapshot.random_value(rng))
+                elif name in ("Stack", "Binary Heap"):
+                    snapshot.pop()
+                else:
+                    snapshot.dequeue()
+            if name in ("BST", "AVL Tree", "Persistent BST"):
+                snapshot.layout()
+            return {name: snapshot}, f"Deleted {count} values from {name}"
+
+        self.run_job("Delete half", work)
+
+    def run_job(self, title, work, on_fail=None):
+        """Run work(job) on a worker thread and swap in the structures it returns.
+
+        on_fail, if given, is called on the Tk thread when the job is
+        cancelled or raises.
+        """
+        if self.job_running():
+            return
+        self.animator.finish()
+
+        def on_progress(fraction, text):
+            self.status_label.config(text=f"{title}: {fraction:.0%} ({text})", fg=self.text_color)
+
+        def on_done(result):
+            structures, message = result
+            self.adopt_structures(structures)
+            self.status_label.config(text=message, fg=self.success_color)
+            self.show_structure()
+
+        def on_error(error):
+            if on_fail is not None:
+                on_fail()
+            if isinstance(error, JobCancelled):
+                self.status_label.config(text=f"{title} cancelled", fg=self.error_color)
+            else:
+                self.status_label.config(text=f"Error: {str(error)}", fg=self.error_color)
+
+        self.status_label.config(text=f"{title}: starting", fg=self.text_color)
+        self.job = BackgroundJob(self.root, work, on_done, on_progress, on_error)
+
+    def job_running(self):
+        """Check for a running background job, reporting it on the status line.
+
+        Its result will replace the live structures, so edits made meanwhile
+        would be lost and are refused instead.
+        """
+        if self.job is not None and self.job.running:
+            self.status_label.config(text="A background job is already running", fg=self.error_color)
+            return True
+        return False
+
+    def cancel_job(self):
+        """Cancel the running background job, if any."""
+        if self.job is not None and self.job.running:
+            self.job.cancel()
+
+    def adopt_structures(self, structures):
+        """Replace live structures with snapshots produced by a background job."""
+        for name, structure in structures.items():
+            structure.stats = self.stats
+            if isinstance(structure, BST):
+                # A loaded snapshot brings its own duplicate mode; show it on the checkbox
+                self.multiset_var.set(structure.multiset)
+            if name == "BST":
+                self.bst = structure
+            elif name == "AVL Tree":
+                self.avl = structure
+            elif name == "Stack":
+                self.stack = structure
+            elif name == "Queue":
+                self.queue = structure
+            elif name == "Binary Heap":
+                self.heap = structure
+            elif name == "Hash Table":
+                self.hash_table = structure
+            elif name == "B-Tree":
+                self.btree = structure
+            elif name == "Graph":
+                self.graph = structure
+            elif name == "Persistent BST":
+                self.pbst = structure
+
     def show_structure(self):
-        """Display the current data structure."""
-        self.clear_canvas()
-        
+        """Schedule a redraw of the current data structure."""
+        # Operations end by requesting a redraw, which closes their mutation phase
+        if self.stats is not None and self._operation_start is not None:
+            self.stats.count(mutation_time=time.perf_counter() - self._operation_start)
+        self._operation_start = None
+        self.scheduler.request()
+
+    def render_structure(self):
+        """Display the current data structure, updating only the items that changed."""
         # Create colors dictionary
         colors = {
             'primary': self.primary_color,
-            'secondary': self.secondary_color
+            'secondary': self.secondary_color,
+            'accent': self.accent_color
         }
+        # Query matches stay lit; unchanged items are left alone by the renderer
+        highlight = set(self.matches)
+        if self.highlight is not None:
+            highlight.add(self.highlight)
 
-        if self.current_structure == "BST":
-            self.bst.draw(self.canvas, colors=colors)
-        elif self.current_structure == "Stack":
-            self.stack.draw(self.canvas, colors=colors)
-        elif self.current_structure == "Queue":
-            self.queue.draw(self.canvas, colors=colors)
+        with self.phase("layout"):
+            if self.current_structure == "BST":
+                self.bst.layout()
+            elif self.current_structure == "AVL Tree":
+                self.avl.layout()
+            elif self.current_structure == "Graph":
+                self.graph.layout()
+            elif self.current_structure == "Persistent BST":
+                self.pbst.layout()
+
+        with self.phase("draw"):
+            self.renderer.begin_frame()
+            if self.current_structure == "BST":
+                self.bst.draw(self.renderer, colors=colors, viewport=self.viewport, highlight=highlight)
+            elif self.current_structure == "AVL Tree":
+                self.avl.draw(self.renderer, colors=colors, viewport=self.viewport, highlight=highlight)
+            elif self.current_structure == "Stack":
+                self.stack.draw(self.renderer, colors=colors, highlight=highlight, width=self.viewport.width)
+            elif self.current_structure == "Queue":
+                self.queue.draw(self.renderer, colors=colors, highlight=highlight, width=self.viewport.width)
+            elif self.current_structure == "Binary Heap":
+                self.heap.draw(self.renderer, colors=colors, highlight=highlight, width=self.viewport.width)
+            elif self.current_structure == "Hash Table":
+                self.hash_table.draw(self.renderer, colors=colors, highlight=highlight, width=self.viewport.width)
+            elif self.current_structure == "B-Tree":
+                self.btree.draw(self.renderer, colors=colors, highlight=highlight, width=self.viewport.width)
+            elif self.current_structure == "Graph":
+                self.graph.draw(self.renderer, colors=colors, viewport=self.viewport, highlight=highlight)
+            elif self.current_structure == "Persistent BST":
+                self.pbst.draw(self.renderer, colors=colors, viewport=self.viewport, highlight=highlight)
+            self.renderer.end_frame()
+
+        if self.stats is not None:
+            self.stats_label.config(text=self.stats.summary())
+        if self.current_structure == "Persistent BST":
+            self.history_scale.config(to=len(self.pbst.versions) - 1)
+            self.history_scale.set(self.pbst.version)
 
     def clear_canvas(self):
         """Clear the canvas for a fresh drawing."""
-        self.canvas.delete("all")
+        self.renderer.clear()
         self.status_label.config(text="Ready to start", fg=self.text_color)
 
 # --- Main Loop ---
@@ -0,0 +1,179 @@
+"""Stack, Queue, BinaryHeap, HashTable and CSRGraph against reference models."""
+import heapq
+import math
+import random
+import unittest
+from collections import deque
+
+from DSA_python_V2 import BinaryHeap, CSRGraph, HashTable, Queue, Stack
+
+
+class StackQueueTest(unittest.TestCase):
+    def test_stack_matches_list(self):
+        rng = random.Random(1)
+        stack = Stack()
+        model = []
+        for _ in range(1000):
+            if rng.random() < 0.55:
+                value = rng.randrange(100)
+                stack.push(value)
+                model.append(value)
+            else:
+                self.assertEqual(stack.pop(), model.pop() if model else None)
+            self.assertEqual(len(stack), len(model))
+        stack.push_many(range(10))
+        self.assertEqual(stack.items, model + list(range(10)))
+
+    def test_queue_matches_deque_across_wraparound(self):
+        rng = random.Random(2)
+        queue = Queue(capacity=1)
+        model = deque()
+        for _ in range(2000):
+            roll = rng.random()
+            if roll < 0.5:
+                value = rng.randrange(100)
+                queue.enqueue(value)
+                model.append(value)
+            elif roll < 0.55:
+                batch = [rng.randrange(100) for _ in range(rng.randrange(20))]
+                queue.enqueue_many(batch)
+                model.extend(batch)
+            else:
+                self.assertEqual(queue.dequeue(), model.popleft() if model else None)
+            self.assertEqual(list(queue), list(model))
+            self.assertEqual(queue.peek(), model[0] if model else None)
+
+    def test_queue_rejects_empty_capacity(self):
+        with self.assertRaises(ValueError):
+            Queue(capacity=0)
+
+
+class BinaryHeapTest(unittest.TestCase):
+    def test_matches_heapq(self):
+        rng = random.Random(3)
+        heap = BinaryHeap()
+        model = []
+        for _ in range(2000):
+            roll = rng.random()
+            if roll < 0.4:
+                value = rng.randrange(1000)
+                heap.push(value)
+                heapq.heappush(model, value)
+            elif roll < 0.5:
+                value = rng.randrange(1000)
+                list(heap.push_steps(value))
+                heapq.heappush(model, value)
+            elif roll < 0.6:
+                value = rng.randrange(1000)
+                expected = heapq.heappushpop(model, value)
+                self.assertEqual(heap.push_pop(value), expected)
+            elif roll < 0.7 and model:
+                self.assertEqual(heap.peek(), model[0])
+                list(heap.pop_steps())
+                heapq.heappop(model)
+            else:
+                self.assertEqual(heap.pop(), heapq.heappop(model) if model else None)
+            self.assertEqual(sorted(heap.items), sorted(model))
+        self.assertEqual(sorted(BinaryHeap.heapify(model).items), sorted(model))
+
+    def test_position_index_and_decrease_key(self):
+        rng = random.Random(4)
+        heap = BinaryHeap(indexed=True)
+        values = rng.sample(range(10000, 20000), 400)
+        live = set()
+        next_small = 9999
+        for value in values:
+            if rng.random() < 0.5:
+                heap.push(value)
+            else:
+                list(heap.push_steps(value))
+            live.add(value)
+            if rng.random() < 0.3:
+                old = rng.choice(sorted(live))
+                heap.decrease_key(old, next_small)
+                live.remove(old)
+                live.add(next_small)
+                next_small -= 1
+            if rng.random() < 0.2:
+                live.remove(heap.pop())
+            self.assertEqual(heap.positions, {item: i for i, item in enumerate(heap.items)})
+        self.assertEqual(sorted(heap.items), sorted(live))
+        with self.assertRaises(ValueError):
+            heap.decrease_key(heap.peek(), heap.peek() + 1)
+
+
+class HashTableTest(unittest.TestCase):
+    def test_matches_set_through_incremental_resizes(self):
+        rng = random.Random(5)
+        table = HashTable(capacity=2, migrate_step=2)
+        model = set()
+        resized = False
+        for _ in range(5000):
+            key = rng.randrange(800)
+            if rng.random() < 0.6:
+                self.assertEqual(table.insert(key), key not in model)
+                model.add(key)
+            else:
+                self.assertEqual(table.delete(key), key in model)
+                model.discard(key)
+            resized = resized or table.resizing
+            self.assertEqual(len(table), len(model))
+        self.assertTrue(resized)
+        self.assertEqual(sorted(table), sorted(model))
+        for key in range(800):
+            self.assertEqual(key in table, key in model)
+        self.assertLessEqual(table.load_factor(), table.max_load)
+        self.assertEqual(sorted(table.copy()), sorted(model))
+
+
+def reference_distances(edges, n, source):
+    """Bellman-Ford distances, slow but obviously correct."""
+    dist = [math.inf] * n
+    dist[source] = 0.0
+    for _ in range(n):
+        for u, v, w in edges:
+            if dist[u] + w < dist[v]:
+                dist[v] = dist[u] + w
+    return dist
+
+
+class CSRGraphTest(unittest.TestCase):
+    def build(self, seed):
+        rng = random.Random(seed)
+        edges = list(CSRGraph.random_edges(40, 90, rng))
+        return edges, CSRGraph.from_edges(edges, weighted=True, undirected=True)
+
+    def test_edges_and_degrees(self):
+        edges, graph = self.build(6)
+        arcs = sorted((u, v) for u, v, _ in graph.edges())
+        expected = sorted([(u, v) for u, v, _ in edges] + [(v, u) for u, v, _ in edges if u != v])
+        self.assertEqual(arcs, expected)
+        for u in range(graph.num_vertices):
+            self.assertEqual(graph.degree(u), sum(1 for a, _ in expected if a == u))
+
+    def test_traversals_reach_every_vertex_once(self):
+        _, graph = self.build(7)
+        for order in (graph.bfs(0), graph.dfs(0)):
+            visited = list(order)
+            self.assertEqual(sorted(visited), list(range(graph.num_vertices)))
+
+    def test_dijkstra_matches_bellman_ford(self):
+        _, graph = self.build(8)
+        dist, parent = graph.dijkstra(0)
+        self.assertEqual(dist, reference_distances(list(graph.edges()), graph.num_vertices, 0))
+        distance, path = graph.shortest_path(0, 17)
+        self.assertEqual(distance, dist[17])
+        self.assertEqual(path[0], 0)
+        self.assertEqual(path[-1], 17)
+
+    def test_remove_edges(self):
+        _, graph = self.build(9)
+        u, v = graph.random_edge(random.Random(1))
+        self.assertTrue(graph.remove_edge(u, v))
+        self.assertNotIn((u, v), {(a, b) for a, b, _ in graph.edges()})
+        self.assertNotIn((v, u), {(a, b) for a, b, _ in graph.edges()})
+        self.assertFalse(graph.remove_edge(u, v))
+
+
+if __name__ == "__main__":
+    unittest.main()
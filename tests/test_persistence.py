@@ -0,0 +1,168 @@
+"""Snapshot and operation-log round-trips."""
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from DSA_python_V2 import (
+    AVLTree, BST, BTree, BinaryHeap, CSRGraph, HashTable, OPLOG_STRUCTURES, PersistentBST, Queue,
+    Stack, generate_operation_log, load_structure, replay_operation_log, save_structure,
+)
+
+
+def contents(structure):
+    """Return a comparable summary of a structure's contents."""
+    if isinstance(structure, BST):
+        return list(structure.inorder()), structure.multiset
+    if isinstance(structure, (Stack, BinaryHeap)):
+        return list(structure.items)
+    if isinstance(structure, Queue):
+        return list(structure)
+    if isinstance(structure, HashTable):
+        return sorted(structure), structure.capacity, structure.resizing
+    if isinstance(structure, BTree):
+        return structure.inorder_list(), structure.t
+    return sorted(structure.edges()), structure.num_vertices, structure.undirected
+
+
+def fresh_structures():
+    """Return one empty instance of every structure an operation log can name."""
+    return {
+        "BST": BST(),
+        "AVL Tree": AVLTree(),
+        "Stack": Stack(),
+        "Queue": Queue(),
+        "Binary Heap": BinaryHeap(),
+        "Hash Table": HashTable(),
+        "B-Tree": BTree(),
+        "Persistent BST": PersistentBST(),
+    }
+
+
+class TempDirTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def path(self, name):
+        return os.path.join(self.dir, name)
+
+
+class SnapshotTest(TempDirTest):
+    def round_trip(self, name, structure):
+        path = self.path("structure.dsasnap")
+        save_structure(structure, path)
+        loaded_name, loaded = load_structure(path)
+        self.assertEqual(loaded_name, name)
+        self.assertIs(type(loaded), type(structure))
+        self.assertEqual(contents(loaded), contents(structure))
+        return loaded
+
+    def test_every_structure(self):
+        rng = random.Random(1)
+        values = [rng.randrange(1000) for _ in range(500)]
+        table = HashTable(migrate_step=2)
+        table.insert_many(values)
+        structures = {
+            "Stack": Stack(),
+            "Queue": Queue(),
+            "Binary Heap": BinaryHeap(),
+            "B-Tree": BTree(2),
+        }
+        structures["Stack"].push_many(values)
+        structures["Queue"].enqueue_many(values)
+        structures["Binary Heap"].push_many(values)
+        structures["B-Tree"].insert_many(values)
+        structures["Hash Table"] = table
+        structures["Graph"] = CSRGraph.from_edges(
+            CSRGraph.random_edges(50, 120, rng), weighted=True, undirected=True)
+        for name, kind in (("BST", BST), ("AVL Tree", AVLTree), ("Persistent BST", PersistentBST)):
+            for multiset in (False, True):
+                tree = kind(multiset=multiset)
+                for value in values:
+                    tree.insert(value)
+                with self.subTest(name=name, multiset=multiset):
+                    self.round_trip(name, tree)
+        for name, structure in structures.items():
+            with self.subTest(name=name):
+                self.round_trip(name, structure)
+
+    def test_loaded_structures_stay_usable(self):
+        table = HashTable(migrate_step=2)
+        table.insert_many(range(7))
+        self.assertTrue(table.resizing)
+        loaded = self.round_trip("Hash Table", table)
+        loaded.insert_many(range(7, 100))
+        self.assertEqual(sorted(loaded), list(range(100)))
+        tree = self.round_trip("AVL Tree", AVLTree.from_sorted(range(100)))
+        tree.delete(50)
+        self.assertEqual(len(tree), 99)
+        self.assertEqual(tree.select(50), 51)
+
+    def test_extreme_values(self):
+        ints = [-2 ** 63, -1, 0, 2 ** 63 - 1]
+        floats = [-1e308, -0.5, 0.0, 1.5, 1e-300, 1e308]
+        for values in (ints, floats, [1, 2.5, 3]):
+            with self.subTest(values=values):
+                tree = AVLTree()
+                stack = Stack()
+                for value in values:
+                    tree.insert(value)
+                stack.push_many(values)
+                self.assertEqual(list(self.round_trip("AVL Tree", tree).inorder()), sorted(values))
+                self.assertEqual(self.round_trip("Stack", stack).items, values)
+
+    def test_rejects_ints_beyond_64_bits(self):
+        for value in (2 ** 63, -2 ** 63 - 1, 10 ** 400):
+            with self.subTest(value=value):
+                stack = Stack()
+                stack.push_many([1, value, 2.5])
+                path = self.path("big.dsasnap")
+                with self.assertRaises(ValueError):
+                    save_structure(stack, path)
+                self.assertFalse(os.path.exists(path))
+
+    def test_rejects_foreign_files(self):
+        path = self.path("junk.dsasnap")
+        with open(path, "wb") as f:
+            f.write(b"not a snapshot")
+        with self.assertRaises(ValueError):
+            load_structure(path)
+
+
+class OperationLogTest(TempDirTest):
+    def test_replay_matches_direct_application(self):
+        for name in OPLOG_STRUCTURES:
+            with self.subTest(name=name):
+                path = self.path("ops.dsalog")
+                generate_operation_log(path, 2000, name, seed=3)
+                replayed = fresh_structures()
+                count = replay_operation_log(path, replayed, chunk_records=97)
+                self.assertEqual(count, 2000)
+
+                # Apply the same seeded operations directly
+                expected = fresh_structures()[name]
+                rng = random.Random(3)
+                add, remove = {
+                    "Stack": ("push", "pop"), "Queue": ("enqueue", "dequeue"), "Binary Heap": ("push", "pop"),
+                }.get(name, ("insert", "delete"))
+                for _ in range(2000):
+                    if rng.random() < 0.6:
+                        getattr(expected, add)(rng.randint(1, 100))
+                    elif remove == "delete":
+                        expected.delete(rng.randint(1, 100))
+                    else:
+                        getattr(expected, remove)()
+                self.assertEqual(contents(replayed[name]), contents(expected))
+
+    def test_rejects_foreign_files(self):
+        path = self.path("junk.dsalog")
+        with open(path, "wb") as f:
+            f.write(b"not a log")
+        with self.assertRaises(ValueError):
+            replay_operation_log(path, fresh_structures())
+
+
+if __name__ == "__main__":
+    unittest.main()
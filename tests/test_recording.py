@@ -0,0 +1,63 @@
+"""Recordings made in the visualizer replay to the live state."""
+import unittest
+from unittest import mock
+
+import DSA_python_V2
+from DSA_python_V2 import OPLOG_STRUCTURES, DataStructureVisualizer, replay_operation_log
+
+from tests.test_persistence import TempDirTest, contents
+
+
+class RecordingTest(TempDirTest):
+    """Drive the visualizer with Tk mocked out and animation switched off."""
+
+    def setUp(self):
+        super().setUp()
+        for name in ("tk", "ttk", "filedialog"):
+            patcher = mock.patch.object(DSA_python_V2, name)
+            self.addCleanup(patcher.stop)
+            patcher.start()
+        DSA_python_V2.tk.BooleanVar.return_value.get.return_value = False
+        self.app = DataStructureVisualizer(mock.MagicMock(), seed=7)
+        self.log = self.path("session.dsalog")
+        DSA_python_V2.filedialog.asksaveasfilename.return_value = self.log
+
+    def test_replay_matches_live_state(self):
+        app = self.app
+        initial = {name: structure.copy() for name, structure in app.structures().items()}
+        app.toggle_recording()
+        for name in OPLOG_STRUCTURES:
+            app.current_structure = name
+            for _ in range(40):
+                app.insert()
+            app.insert_batch(25)
+            for _ in range(30):
+                app.delete()
+        app.toggle_recording()
+
+        replay_operation_log(self.log, initial)
+        for name in OPLOG_STRUCTURES:
+            with self.subTest(name=name):
+                self.assertEqual(contents(initial[name]), contents(app.structures()[name]))
+
+    def test_unloggable_edits_are_refused(self):
+        app = self.app
+        app.current_structure = "Persistent BST"
+        for _ in range(5):
+            app.insert()
+        before = list(app.pbst.inorder())
+        app.toggle_recording()
+        app.undo()
+        app.goto_version("0")
+        app.bulk_load(100)
+        app.delete_half()
+        app.load_snapshot()
+        app.replay_log()
+        self.assertIsNone(app.job)
+        self.assertEqual(list(app.pbst.inorder()), before)
+        DSA_python_V2.filedialog.askopenfilename.assert_not_called()
+        app.toggle_recording()
+
+
+if __name__ == "__main__":
+    unittest.main()
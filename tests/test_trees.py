@@ -0,0 +1,239 @@
+"""Binary search trees and the B-tree against sorted-list reference models."""
+import bisect
+import random
+import unittest
+
+from DSA_python_V2 import AVLTree, BST, BTree, CompactBST, PersistentBST
+
+
+def check_bst(test, tree):
+    """Assert order, subtree sizes and (for AVL trees) balance and cached heights.
+
+    Rotations can move a duplicate to either side of its twin, so both
+    bounds are inclusive.
+    """
+    def walk(node, lo, hi):
+        if node is None:
+            return 0, 0
+        test.assertGreaterEqual(node.count, 1)
+        if lo is not None:
+            test.assertGreaterEqual(node.value, lo)
+        if hi is not None:
+            test.assertLessEqual(node.value, hi)
+        left_size, left_height = walk(node.left, lo, node.value)
+        right_size, right_height = walk(node.right, node.value, hi)
+        test.assertEqual(node.size, node.count + left_size + right_size)
+        if isinstance(tree, AVLTree):
+            test.assertLessEqual(abs(left_height - right_height), 1)
+            test.assertEqual(node.height, 1 + max(left_height, right_height))
+        return node.size, 1 + max(left_height, right_height)
+
+    walk(tree.root, None, None)
+
+
+class BinarySearchTreeTest(unittest.TestCase):
+    """Random inserts, batch inserts and deletes checked after every step."""
+    kinds = (BST, AVLTree, PersistentBST)
+
+    def run_model(self, kind, multiset, seed):
+        rng = random.Random(seed)
+        tree = kind(multiset=multiset)
+        model = []
+        for _ in range(300):
+            value = rng.randrange(60)
+            roll = rng.random()
+            if roll < 0.5:
+                tree.insert(value)
+                bisect.insort(model, value)
+            elif roll < 0.55:
+                batch = [rng.randrange(60) for _ in range(rng.randrange(1, 80))]
+                tree.insert_many(batch)
+                model = sorted(model + batch)
+            else:
+                tree.delete(value)
+                i = bisect.bisect_left(model, value)
+                if i < len(model) and model[i] == value:
+                    del model[i]
+            self.assertEqual(list(tree.inorder()), model)
+            self.assertEqual(len(tree), len(model))
+        check_bst(self, tree)
+        return tree, model
+
+    def test_matches_sorted_list(self):
+        for kind in self.kinds:
+            for multiset in (False, True):
+                with self.subTest(kind=kind.__name__, multiset=multiset):
+                    self.run_model(kind, multiset, seed=1)
+
+    def test_order_statistics_and_neighbours(self):
+        for kind in self.kinds:
+            for multiset in (False, True):
+                with self.subTest(kind=kind.__name__, multiset=multiset):
+                    tree, model = self.run_model(kind, multiset, seed=2)
+                    for k, value in enumerate(model):
+                        self.assertEqual(tree.select(k), value)
+                    for value in range(-1, 62):
+                        self.assertEqual(tree.rank(value), bisect.bisect_left(model, value))
+                        below = model[:bisect.bisect_right(model, value)]
+                        above = model[bisect.bisect_left(model, value):]
+                        self.assertEqual(tree.floor(value), below[-1] if below else None)
+                        self.assertEqual(tree.ceiling(value), above[0] if above else None)
+                        smaller = model[:bisect.bisect_left(model, value)]
+                        larger = model[bisect.bisect_right(model, value):]
+                        self.assertEqual(tree.predecessor(value), smaller[-1] if smaller else None)
+                        self.assertEqual(tree.successor(value), larger[0] if larger else None)
+                        self.assertEqual(value in tree, value in model)
+                    self.assertEqual(list(tree.range(10, 30)), [v for v in model if 10 <= v <= 30])
+
+    def test_traversals_agree_on_contents(self):
+        for kind in self.kinds:
+            for multiset in (False, True):
+                with self.subTest(kind=kind.__name__, multiset=multiset):
+                    tree, model = self.run_model(kind, multiset, seed=3)
+                    for order in (tree.preorder, tree.postorder, tree.level_order):
+                        self.assertEqual(sorted(order()), model)
+
+    def test_from_sorted_and_copy(self):
+        values = [random.Random(4).randrange(100) for _ in range(500)]
+        for kind in self.kinds:
+            for multiset in (False, True):
+                with self.subTest(kind=kind.__name__, multiset=multiset):
+                    tree = kind.from_sorted(values, multiset=multiset)
+                    check_bst(self, tree)
+                    self.assertEqual(list(tree.inorder()), sorted(values))
+                    twin = tree.copy()
+                    twin.insert(1000)
+                    self.assertEqual(list(tree.inorder()), sorted(values))
+                    self.assertEqual(twin.multiset, multiset)
+
+    def test_avl_height_is_logarithmic(self):
+        tree = AVLTree()
+        for value in range(4096):
+            tree.insert(value)
+        self.assertLessEqual(tree.height(), 14)
+        check_bst(self, tree)
+
+
+class PersistentBSTTest(unittest.TestCase):
+    def test_versions_are_unchanged_by_later_edits(self):
+        rng = random.Random(5)
+        tree = PersistentBST()
+        history = [[]]
+        model = []
+        for _ in range(200):
+            value = rng.randrange(50)
+            if rng.random() < 0.6:
+                tree.insert(value)
+                bisect.insort(model, value)
+            elif value in model:
+                tree.delete(value)
+                model.remove(value)
+            else:
+                continue
+            history.append(list(model))
+        for version, expected in enumerate(history):
+            tree.goto(version)
+            self.assertEqual(list(tree.inorder()), expected)
+
+    def test_undo_redo(self):
+        tree = PersistentBST()
+        for value in (5, 3, 8):
+            tree.insert(value)
+        self.assertTrue(tree.undo())
+        self.assertEqual(list(tree.inorder()), [3, 5])
+        self.assertTrue(tree.redo())
+        self.assertEqual(list(tree.inorder()), [3, 5, 8])
+        self.assertFalse(tree.redo())
+        tree.undo()
+        tree.insert(1)
+        self.assertEqual(list(tree.inorder()), [1, 3, 5])
+        self.assertFalse(tree.redo())
+
+
+class CompactBSTTest(unittest.TestCase):
+    def test_matches_sorted_list_and_reuses_slots(self):
+        rng = random.Random(6)
+        tree = CompactBST()
+        model = []
+        for _ in range(2000):
+            value = rng.randrange(300)
+            if rng.random() < 0.6:
+                tree.insert(value)
+                bisect.insort(model, value)
+            else:
+                tree.delete(value)
+                if value in model:
+                    model.remove(value)
+        self.assertEqual(tree.inorder_list(), model)
+        self.assertEqual(len(tree), len(model))
+        # Freed slots are reused, so the arrays never outgrow the peak size
+        self.assertLessEqual(len(tree.keys), 1200)
+
+    def test_rejected_value_does_not_leak_a_slot(self):
+        tree = CompactBST()
+        tree.insert(1)
+        tree.insert(2)
+        tree.delete(2)
+        with self.assertRaises(OverflowError):
+            tree.insert(2 ** 70)
+        tree.insert(3)
+        self.assertEqual(tree.inorder_list(), [1, 3])
+        self.assertEqual(len(tree.keys), 2)
+
+
+class BTreeTest(unittest.TestCase):
+    def check_invariants(self, tree):
+        t = tree.t
+        depths = set()
+        keys = []
+
+        def walk(node, depth, lo, hi):
+            if node is not tree.root:
+                self.assertGreaterEqual(len(node.keys), t - 1)
+            self.assertLessEqual(len(node.keys), 2 * t - 1)
+            self.assertEqual(node.keys, sorted(node.keys))
+            for key in node.keys:
+                self.assertTrue(lo is None or key > lo)
+                self.assertTrue(hi is None or key < hi)
+            if not node.children:
+                depths.add(depth)
+                keys.extend(node.keys)
+                return
+            self.assertEqual(len(node.children), len(node.keys) + 1)
+            bounds = [lo] + node.keys + [hi]
+            for i, child in enumerate(node.children):
+                walk(child, depth + 1, bounds[i], bounds[i + 1])
+                if i < len(node.keys):
+                    keys.append(node.keys[i])
+
+        walk(tree.root, 0, None, None)
+        self.assertLessEqual(len(depths), 1)
+        return keys
+
+    def test_matches_set(self):
+        for t in (2, 3, 5):
+            with self.subTest(min_degree=t):
+                rng = random.Random(t)
+                tree = BTree(t)
+                model = set()
+                for _ in range(3000):
+                    key = rng.randrange(500)
+                    if rng.random() < 0.55:
+                        self.assertEqual(tree.insert(key), key not in model)
+                        model.add(key)
+                    else:
+                        self.assertEqual(tree.delete(key), key in model)
+                        model.discard(key)
+                    self.assertEqual(len(tree), len(model))
+                self.assertEqual(self.check_invariants(tree), sorted(model))
+                self.assertEqual(tree.inorder_list(), sorted(model))
+                for key in range(500):
+                    self.assertEqual(key in tree, key in model)
+
+    def test_rejects_small_degree(self):
+        with self.assertRaises(ValueError):
+            BTree(1)
+
+
+if __name__ == "__main__":
+    unittest.main()